@@ -1,6 +1,77 @@
 from langchain.schema import HumanMessage, AIMessage
+from Model.llm_cache import llm_cache
+from configure.registry import model_registry
+from typing import AsyncIterator, Iterator
+import time
 
-def invoke_model(llm, prompt: str) -> AIMessage:
-    """Helper to invoke LLM with a single prompt."""
-    response = llm([HumanMessage(content=prompt)])
-    return response
\ No newline at end of file
+def invoke_model(llm, prompt: str, use_cache: bool = True) -> AIMessage:
+    """Helper to invoke LLM with a single prompt.
+
+    Identical (model, parameters, prompt) calls are answered from llm_cache;
+    pass use_cache=False for calls that must produce a fresh generation.
+    """
+    if not use_cache:
+        llm_cache.record_bypass()
+        with model_registry.track(llm):
+            return llm([HumanMessage(content=prompt)])
+
+    key = llm_cache.key(llm, prompt)
+    cached = llm_cache.get(key)
+    if cached is not None:
+        return AIMessage(content=cached)
+
+    start = time.time()
+    with model_registry.track(llm):
+        response = llm([HumanMessage(content=prompt)])
+    llm_cache.put(key, response.content, time.time() - start)
+    return response
+
+async def ainvoke_model(llm, prompt: str, use_cache: bool = True) -> AIMessage:
+    """Async counterpart of invoke_model, built on the model's ainvoke and sharing its cache."""
+    if not use_cache:
+        llm_cache.record_bypass()
+        with model_registry.track(llm):
+            return await llm.ainvoke([HumanMessage(content=prompt)])
+
+    key = llm_cache.key(llm, prompt)
+    cached = llm_cache.get(key)
+    if cached is not None:
+        return AIMessage(content=cached)
+
+    start = time.time()
+    with model_registry.track(llm):
+        response = await llm.ainvoke([HumanMessage(content=prompt)])
+    llm_cache.put(key, response.content, time.time() - start)
+    return response
+
+def invoke_model_stream(llm, prompt: str) -> Iterator[str]:
+    """Streaming variant of invoke_model: yields text chunks as the model produces them.
+
+    Streams are never cached. Time to first token is recorded in the
+    model registry stats.
+    """
+    llm_cache.record_bypass()
+    start = time.time()
+    first = True
+    with model_registry.track(llm):
+        for chunk in llm.stream([HumanMessage(content=prompt)]):
+            if not chunk.content:
+                continue
+            if first:
+                model_registry.record_first_token(llm, time.time() - start)
+                first = False
+            yield chunk.content
+
+async def ainvoke_model_stream(llm, prompt: str) -> AsyncIterator[str]:
+    """Async counterpart of invoke_model_stream, built on the model's astream."""
+    llm_cache.record_bypass()
+    start = time.time()
+    first = True
+    with model_registry.track(llm):
+        async for chunk in llm.astream([HumanMessage(content=prompt)]):
+            if not chunk.content:
+                continue
+            if first:
+                model_registry.record_first_token(llm, time.time() - start)
+                first = False
+            yield chunk.content
\ No newline at end of file
@@ -0,0 +1,129 @@
+from config.log import logger
+from config.settings import LLM_CACHE_SIZE, LLM_CACHE_PATH, LLM_CACHE_TTL
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import hashlib
+import sqlite3
+import threading
+import json
+import time
+import os
+
+
+def model_identity(llm) -> str:
+    """Stable description of a chat model: its class plus the parameters that shape output."""
+    try:
+        params = dict(llm._identifying_params)
+    except Exception:
+        params = {name: getattr(llm, name) for name in ('model', 'model_name', 'temperature', 'base_url') if hasattr(llm, name)}
+    # Credentials and client handles are not part of the identity
+    params = {k: v for k, v in params.items() if 'key' not in k.lower() and 'client' not in k.lower()}
+    return f"{type(llm).__name__}:{json.dumps(params, sort_keys=True, default=str)}"
+
+
+class LLMCache:
+    """In-memory LRU of model responses with an optional SQLite tier that survives restarts.
+
+    Entries in both tiers expire ttl seconds after the response was created.
+    """
+
+    def __init__(self, max_entries: int = LLM_CACHE_SIZE, path: str = LLM_CACHE_PATH, ttl: float = LLM_CACHE_TTL):
+        self.max_entries = max_entries
+        self.path = path
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[str, float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._stats = {
+            'hits': 0,
+            'persistent_hits': 0,
+            'misses': 0,
+            'bypassed': 0,
+            'saved_latency': 0.0
+        }
+
+    def key(self, llm, prompt: str) -> str:
+        digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        return hashlib.sha256(f"{model_identity(llm)}\n{digest}".encode('utf-8')).hexdigest()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if not self.path:
+            return None
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    content TEXT NOT NULL,
+                    latency REAL NOT NULL,
+                    created_at REAL NOT NULL
+                )""")
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response text, or None on a miss or expiry."""
+        with self._lock:
+            oldest = time.time() - self.ttl
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] <= oldest:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                self._stats['saved_latency'] += entry[1]
+                return entry[0]
+            try:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT content, latency, created_at FROM responses WHERE key = ? AND created_at > ?",
+                    (key, oldest)
+                ).fetchone() if conn else None
+            except sqlite3.Error as e:
+                logger.error(f"LLM cache read failed: {str(e)}")
+                row = None
+            if row is None:
+                self._stats['misses'] += 1
+                return None
+            self._remember(key, row[0], row[1], row[2])
+            self._stats['hits'] += 1
+            self._stats['persistent_hits'] += 1
+            self._stats['saved_latency'] += row[1]
+            return row[0]
+
+    def put(self, key: str, content: str, latency: float):
+        now = time.time()
+        with self._lock:
+            self._remember(key, content, latency, now)
+            try:
+                conn = self._connect()
+                if conn:
+                    conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)", (key, content, latency, now))
+                    conn.commit()
+            except sqlite3.Error as e:
+                logger.error(f"LLM cache write failed: {str(e)}")
+
+    def _remember(self, key: str, content: str, latency: float, created_at: float):
+        self._entries[key] = (content, latency, created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def record_bypass(self):
+        with self._lock:
+            self._stats['bypassed'] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                **self._stats,
+                'entries': len(self._entries),
+                'hit_rate': self._stats['hits'] / lookups if lookups else 0.0
+            }
+
+
+llm_cache = LLMCache()
\ No newline at end of file
@@ -0,0 +1,38 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List
+
+
+@dataclass
+class ResearchPlan:
+    """Everything the research loop needs to know about a topic, computed once up front."""
+    topic: str
+    query_type: str
+    complexity: float
+    vision_query: str
+    search_queries: List[str] = field(default_factory=list)
+    query_scores: Dict[str, float] = field(default_factory=dict)
+
+    def has_label(self, label: str, min_score: float = 0.3) -> bool:
+        """True for the primary type and for any secondary type the classifier scored highly enough."""
+        return label == self.query_type or self.query_scores.get(label, 0.0) >= min_score
+
+    @property
+    def min_sources(self) -> int:
+        return max(2, int(self.complexity * 5))
+
+    @property
+    def max_sources(self) -> int:
+        return self.min_sources * 2
+
+    @property
+    def quality_threshold(self) -> float:
+        return 0.7 + (self.complexity * 0.2)
+
+
+def search_query_variants(topic: str) -> List[str]:
+    return [
+        topic,
+        f"{topic} latest information",
+        f"{topic} current data {datetime.now().strftime('%Y')}"
+    ]
\ No newline at end of file
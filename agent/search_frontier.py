@@ -0,0 +1,42 @@
+from tools.brave_search import SearchResult
+from tools.extract_urls import urls_from_results
+from tools.url_canon import url_canonicalizer
+from typing import Dict, List
+
+# Score bonus for each additional query variant that returned the same page
+AGREEMENT_BONUS = 0.1
+
+
+class SearchFrontier:
+    """Candidate URLs from several searches merged into one ranked, deduplicated queue.
+
+    A page found by more than one query variant keeps its best snippet
+    score and gains AGREEMENT_BONUS per extra variant.
+    """
+
+    def __init__(self):
+        self._candidates: Dict[str, SearchResult] = {}
+        self._queries: Dict[str, set] = {}
+
+    def add(self, results: List[SearchResult]):
+        """results must already carry scores (see rank_by_snippet)."""
+        for result in results:
+            key = url_canonicalizer.key(result.url)
+            best = self._candidates.get(key)
+            if best is None or result.score > best.score:
+                self._candidates[key] = result
+            self._queries.setdefault(key, set()).add(result.query)
+
+    def _score(self, key: str) -> float:
+        return self._candidates[key].score + AGREEMENT_BONUS * (len(self._queries[key]) - 1)
+
+    def ranked(self) -> List[SearchResult]:
+        keys = sorted(self._candidates, key=self._score, reverse=True)
+        return [self._candidates[key] for key in keys]
+
+    def urls(self) -> List[str]:
+        """Frontier URLs best first, without hosts the circuit breaker is refusing."""
+        return urls_from_results(self.ranked())
+
+    def __len__(self) -> int:
+        return len(self._candidates)
@@ -0,0 +1,218 @@
+from config.log import logger
+from config.settings import TOPIC_STORE_MAX_TOPICS, TOPIC_STORE_MAX_MB, TOPIC_SPILL_DIR
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional
+import threading
+import tempfile
+import hashlib
+import shutil
+import atexit
+import time
+import sys
+import os
+
+# Rough per-object overheads used by the byte estimate (CPython, 64-bit)
+RECORD_OVERHEAD = 200
+FACT_OVERHEAD = 60
+VISITED_OVERHEAD = 90
+
+
+class SourceRecord:
+    """One accepted source. The raw page content lives on disk and is read back only when asked for."""
+    __slots__ = ('url', 'relevance', 'confidence', 'is_complete', 'found_data', 'needs_verification',
+                 'needs_context', 'main_facts', 'timestamp', 'source_quality', 'content_path', 'content_length')
+
+    FIELDS = ('relevance', 'confidence', 'is_complete', 'found_data', 'needs_verification',
+              'needs_context', 'main_facts', 'timestamp', 'source_quality')
+
+    def __init__(self, url: str, fields: Dict, content_path: Optional[str], content_length: int):
+        self.url = url
+        self.relevance = float(fields.get('relevance', 0.0))
+        self.confidence = float(fields.get('confidence', 0.0))
+        self.is_complete = bool(fields.get('is_complete', False))
+        self.found_data = str(fields.get('found_data', ''))
+        self.needs_verification = bool(fields.get('needs_verification', True))
+        self.needs_context = bool(fields.get('needs_context', True))
+        self.main_facts = tuple(fields.get('main_facts', ()))
+        self.timestamp = fields.get('timestamp')
+        self.source_quality = float(fields.get('source_quality', 0.0))
+        self.content_path = content_path
+        self.content_length = content_length
+
+    @property
+    def content(self) -> str:
+        if not self.content_path:
+            return ''
+        try:
+            with open(self.content_path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return ''
+
+    # Mapping-style access, so code written against the old source dicts keeps working
+    def get(self, key: str, default=None):
+        if key == 'url' or key == 'content' or key in self.FIELDS:
+            return getattr(self, key)
+        return default
+
+    def __getitem__(self, key: str):
+        if key == 'url' or key == 'content' or key in self.FIELDS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def size(self) -> int:
+        return (RECORD_OVERHEAD + len(self.url) + len(self.found_data) +
+                sum(len(fact) + FACT_OVERHEAD for fact in self.main_facts))
+
+
+class TopicResearch:
+    __slots__ = ('sources', 'main_facts', 'visited_urls', 'last_update', 'bytes', '_fact_keys')
+
+    def __init__(self):
+        self.sources: List[SourceRecord] = []
+        self.main_facts: List[str] = []
+        self.visited_urls = set()
+        self.last_update = time.time()
+        self.bytes = RECORD_OVERHEAD
+        self._fact_keys = set()
+
+    def add_facts(self, facts: Iterable[str]) -> int:
+        """Append facts not already recorded (compared case- and whitespace-insensitively)."""
+        added = 0
+        for fact in facts:
+            fact = str(fact)
+            key = ' '.join(fact.lower().split())
+            if not key or key in self._fact_keys:
+                continue
+            self._fact_keys.add(key)
+            self.main_facts.append(fact)
+            self.bytes += len(fact) + FACT_OVERHEAD
+            added += 1
+        return added
+
+    def add_visited(self, key: str):
+        if key not in self.visited_urls:
+            self.visited_urls.add(key)
+            self.bytes += len(key) + VISITED_OVERHEAD
+
+
+class TopicStore:
+    """Per-topic research state, bounded by topic count and estimated bytes with LRU eviction.
+
+    Source content is spilled to files under TOPIC_SPILL_DIR as it arrives;
+    evicting a topic deletes its files. on_evict(topic) lets the owner drop
+    anything else it keeps per topic.
+    """
+
+    def __init__(self, max_topics: int = TOPIC_STORE_MAX_TOPICS, max_mb: float = TOPIC_STORE_MAX_MB,
+                 spill_dir: str = TOPIC_SPILL_DIR, on_evict: Callable[[str], None] = None):
+        self.max_topics = max(1, max_topics)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.on_evict = on_evict
+        self._topics: "OrderedDict[str, TopicResearch]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._stats = {'evictions': 0, 'spilled_bytes': 0, 'spill_files': 0, 'duplicate_facts': 0}
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+        self.spill_dir = tempfile.mkdtemp(prefix='research_', dir=spill_dir or None)
+        atexit.register(shutil.rmtree, self.spill_dir, True)
+
+    def __contains__(self, topic: str) -> bool:
+        with self._lock:
+            return topic in self._topics
+
+    def __getitem__(self, topic: str) -> TopicResearch:
+        with self._lock:
+            self._topics.move_to_end(topic)
+            return self._topics[topic]
+
+    def get(self, topic: str) -> Optional[TopicResearch]:
+        with self._lock:
+            return self._topics.get(topic)
+
+    def start(self, topic: str) -> TopicResearch:
+        with self._lock:
+            research = self._topics.get(topic)
+            if research is None:
+                research = self._topics[topic] = TopicResearch()
+            self._topics.move_to_end(topic)
+            self._evict()
+            return research
+
+    def _spill(self, topic: str, url: str, content: str) -> Optional[str]:
+        if not content:
+            return None
+        name = hashlib.sha1(f"{topic}\n{url}".encode('utf-8')).hexdigest()
+        path = os.path.join(self.spill_dir, f"{name}.txt")
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(content)
+        except OSError as e:
+            logger.warning(f"Could not spill content for {url}: {str(e)}")
+            return None
+        self._stats['spilled_bytes'] += len(content)
+        self._stats['spill_files'] += 1
+        return path
+
+    def add_source(self, topic: str, url: str, content: str, fields: Dict) -> SourceRecord:
+        record = SourceRecord(url, fields, self._spill(topic, url, content), len(content or ''))
+        with self._lock:
+            research = self._topics.get(topic) or self.start(topic)
+            research.sources.append(record)
+            research.bytes += record.size()
+            facts = fields.get('main_facts', [])
+            self._stats['duplicate_facts'] += len(facts) - research.add_facts(facts)
+            research.last_update = time.time()
+            self._evict()
+        return record
+
+    def _total_bytes(self) -> int:
+        return sum(research.bytes for research in self._topics.values())
+
+    def _evict(self):
+        # The most recent topic is the one being researched: never evict it
+        while len(self._topics) > 1 and (len(self._topics) > self.max_topics or
+                                         self._total_bytes() > self.max_bytes):
+            topic, research = self._topics.popitem(last=False)
+            for source in research.sources:
+                if source.content_path:
+                    try:
+                        os.remove(source.content_path)
+                    except OSError:
+                        pass
+            self._stats['evictions'] += 1
+            logger.info(f"Evicted research for topic '{topic}' ({research.bytes / 1024:.0f} KB, "
+                        f"{len(research.sources)} sources)")
+            if self.on_evict:
+                self.on_evict(topic)
+
+    def footprint(self) -> Dict:
+        """Estimated in-process size of the store, spill usage and the process RSS where available."""
+        with self._lock:
+            report = {
+                'topics': len(self._topics),
+                'sources': sum(len(r.sources) for r in self._topics.values()),
+                'facts': sum(len(r.main_facts) for r in self._topics.values()),
+                'visited_urls': sum(len(r.visited_urls) for r in self._topics.values()),
+                'estimated_bytes': self._total_bytes(),
+                'max_bytes': self.max_bytes,
+                'max_topics': self.max_topics,
+                **self._stats
+            }
+        report['rss_bytes'] = _rss_bytes()
+        return report
+
+
+def _rss_bytes() -> Optional[int]:
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Peak, not current: kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except (ImportError, OSError):
+        return None
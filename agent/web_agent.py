@@ -1,18 +1,48 @@
 from memory.research_mem import ResearchMemory
 from tools.host_tracker import host_tracker 
 from config.log import logger
-from typing import Dict, List
-from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urlparse
-import requests 
+import asyncio
+import httpx
+import threading
 import time
 import json
 import re
-from Model.invokemodel import invoke_model
-from extras.safejsonload import safe_json_loads
-from config.settings import BRAVE_API_KEY
-from tools.extract_urls import extract_urls_from_search_results
+from Model.invokemodel import invoke_model, ainvoke_model, invoke_model_stream, ainvoke_model_stream
+from extras.safejsonload import safe_json_loads, validate_schema
+from config.settings import (BRAVE_API_KEY, RESEARCH_WORKERS, RESEARCH_PER_HOST_LIMIT, COMBINED_ASSESSMENT,
+                             ASYNC_CONCURRENCY, SPECULATIVE_SEARCH)
+from tools.extract_urls import urls_from_results
+from tools.url_canon import url_canonicalizer
 from tools.fetch_webpage import fetch_webpage_content
+from tools.brave_search import SearchResult, rank_by_snippet
+from tools.vision_query import generate_vision_query
+from configure.config_llm import configure_llm
+from agent.research_plan import ResearchPlan, search_query_variants
+from agent.search_frontier import SearchFrontier
+from agent.topic_store import TopicStore
+
+PRIORITY_STOCK_DOMAINS = [
+    'marketwatch.com',
+    'finance.yahoo.com',
+    'bloomberg.com',
+    'reuters.com'
+]
+
+# Field types the single-call assessment must return
+COMBINED_ASSESSMENT_SCHEMA = {
+    'relevance': (int, float),
+    'is_complete': bool,
+    'found_data': str,
+    'needs_verification': bool,
+    'needs_context': bool,
+    'confidence': (int, float),
+    'main_facts': list,
+    'timestamp': (str, type(None)),
+    'source_quality': (int, float)
+}
 
 class WebAgent:
     def __init__(self, retriever, llm, prompt, brave_search, wikipedia, provider):
@@ -24,12 +54,21 @@ class WebAgent:
         self.provider = provider
         self.max_retries = 3
         self.retry_delay = 2
-        self.research_memory = {}
+        # Bounded per-topic research state; evicting a topic also drops its cached plan
+        self.research_memory = TopicStore(on_evict=lambda topic: self.research_plans.pop(topic, None))
         self.confidence_threshold = 0.5
         self.host_tracker = host_tracker 
         self.current_topic = None
         self.memory = ResearchMemory()
         self.current_assessment = None
+        self.research_workers = max(1, RESEARCH_WORKERS)
+        self.per_host_limit = max(1, RESEARCH_PER_HOST_LIMIT)
+        self._research_lock = threading.RLock()
+        self._host_slots = {}
+        self.research_plans = {}
+        self.combined_assessment = COMBINED_ASSESSMENT
+        self.async_concurrency = max(1, ASYNC_CONCURRENCY)
+        self.speculative_search = SPECULATIVE_SEARCH
 
     def assess_content_relevance(self, content: str, topic: str) -> Dict:
         assessment_prompt = f"""You are a content assessment expert. Analyze this content's relevance and completeness for the given topic.
@@ -148,6 +187,82 @@ class WebAgent:
                 "source_quality": 0.0
             }
 
+    def _combined_assessment_prompt(self, content: str, topic: str) -> str:
+        return f"""You are a content assessment expert and precise information extractor.
+        Assess this content's relevance and completeness for the topic, and extract the key facts relevant to it.
+        Consider:
+        1. How directly it answers the topic/question
+        2. The specificity and accuracy of information
+        3. Whether it provides context and supporting details
+        4. The currentness and reliability of the information
+        
+        Topic: {topic}
+        Content: {content}
+        
+        You must respond with ONLY a JSON object in this exact format:
+        {{
+            "relevance": <number between 0-1>,
+            "is_complete": <true or false>,
+            "found_data": "<key information found>",
+            "needs_verification": <true or false>,
+            "needs_context": <true or false>,
+            "confidence": <number between 0-1>,
+            "main_facts": [<key facts as strings>],
+            "timestamp": <string or null>,
+            "source_quality": <number between 0-1>
+        }}"""
+
+    def _parse_combined_assessment(self, response_text: str, content: str) -> Optional[Tuple[Dict, Dict]]:
+        """Split a schema-valid combined response into (assessment, info); None if invalid."""
+        json_match = re.search(r'\{[\s\S]*\}', response_text.strip())
+        result = safe_json_loads(json_match.group(0), None, content) if json_match else None
+        if result is None or not validate_schema(result, COMBINED_ASSESSMENT_SCHEMA):
+            logger.warning("Combined assessment did not match schema, falling back to separate calls")
+            return None
+        clamp = lambda value: min(max(float(value), 0.0), 1.0)
+        assessment = {
+            'relevance': clamp(result['relevance']),
+            'is_complete': result['is_complete'],
+            'found_data': result['found_data'],
+            'needs_verification': result['needs_verification'],
+            'needs_context': result['needs_context'],
+            'confidence': clamp(result['confidence'])
+        }
+        info = {
+            'main_facts': [str(fact) for fact in result['main_facts']],
+            'confidence': assessment['confidence'],
+            'timestamp': result.get('timestamp'),
+            'source_quality': clamp(result['source_quality'])
+        }
+        return assessment, info
+
+    def assess_and_extract(self, content: str, topic: str) -> Tuple[Dict, Optional[Dict]]:
+        """Assess relevance and extract key facts in a single model call.
+
+        Returns (assessment, info). If the response does not match
+        COMBINED_ASSESSMENT_SCHEMA, falls back to assess_content_relevance and
+        returns info as None so the caller can run extract_key_information.
+        """
+        try:
+            response = invoke_model(self.llm, self._combined_assessment_prompt(content, topic))
+            parsed = self._parse_combined_assessment(response.content, content)
+            if parsed is not None:
+                return parsed
+        except Exception as e:
+            logger.error(f"Error in combined assessment: {str(e)}")
+        return self.assess_content_relevance(content, topic), None
+
+    async def aassess_and_extract(self, content: str, topic: str) -> Tuple[Dict, Optional[Dict]]:
+        """Async variant of assess_and_extract."""
+        try:
+            response = await ainvoke_model(self.llm, self._combined_assessment_prompt(content, topic))
+            parsed = self._parse_combined_assessment(response.content, content)
+            if parsed is not None:
+                return parsed
+        except Exception as e:
+            logger.error(f"Error in combined assessment: {str(e)}")
+        return await asyncio.to_thread(self.assess_content_relevance, content, topic), None
+
     def assess_question_complexity(self, topic: str) -> float:
         complexity_prompt = f"""
         Analyze the complexity of this research topic/question.
@@ -176,16 +291,43 @@ class WebAgent:
     def _check_information_consistency(self, facts: List[str]) -> bool:
         return True
 
-    def should_continue_research(self, topic: str, current_source: Dict) -> Dict:
+    def plan_research(self, topic: str) -> ResearchPlan:
+        """Build (or reuse) the topic's research plan, running its LLM calls concurrently."""
+        if topic in self.research_plans:
+            return self.research_plans[topic]
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            complexity = executor.submit(self.assess_question_complexity, topic)
+            vision_query = executor.submit(generate_vision_query, configure_llm(self.provider), topic)
+            plan = ResearchPlan(
+                topic=topic,
+                query_type=self.memory.categorize_query(topic),
+                query_scores=self.memory.query_scores(topic),
+                complexity=complexity.result(),
+                vision_query=vision_query.result(),
+                search_queries=search_query_variants(topic)
+            )
+        logger.info(f"Research plan: type={plan.query_type}, complexity={plan.complexity:.2f}, "
+                    f"min_sources={plan.min_sources}")
+        self.research_plans[topic] = plan
+        return plan
+
+    def should_continue_research(self, topic: str, current_source: Dict, plan: ResearchPlan = None) -> Dict:
         if topic not in self.research_memory:
             return {"continue": True, "reason": "No research started yet"}
 
-        findings = self.research_memory[topic]
+        with self._research_lock:
+            research = self.research_memory[topic]
+            findings = {
+                'sources': list(research.sources),
+                'main_facts': list(research.main_facts)
+            }
         sources_count = len(findings['sources'])
-        complexity = self.assess_question_complexity(topic)
+        plan = plan or self.plan_research(topic)
+        complexity = plan.complexity
         
-        min_sources = max(2, int(complexity * 5))
-        quality_threshold = 0.7 + (complexity * 0.2)
+        min_sources = plan.min_sources
+        quality_threshold = plan.quality_threshold
         high_quality_sources = sum(1 for s in findings['sources'] 
                                    if s.get('relevance', 0) > quality_threshold 
                                    and s.get('confidence', 0) > quality_threshold)
@@ -193,8 +335,7 @@ class WebAgent:
         if high_quality_sources >= min_sources:
             return {"continue": False, "reason": "Sufficient high-quality sources found"}
         
-        max_sources = min_sources * 2
-        if sources_count >= max_sources:
+        if sources_count >= plan.max_sources:
             return {"continue": False, "reason": "Maximum sources reached"}
         
         if sources_count > 1:
@@ -211,144 +352,307 @@ class WebAgent:
         
         return {"continue": True, "reason": "Need more information"}
 
-    def brave_search_run(self, query: str, retries: int = 3) -> str:
+    def brave_search_run(self, query: str, retries: int = 3) -> List[SearchResult]:
         if not BRAVE_API_KEY:
             logger.error("Brave Search API key not set. Unable to perform search.")
-            return ""
-        for i in range(retries):
+            return []
+        try:
+            # Caching, rate limiting and 429/5xx retries live in the search client
+            return self.brave_search.search(query, retries=retries)
+        except Exception as e:
+            logger.error(f"Error in Brave search: {str(e)}")
+            return []
+
+    def _claim_url(self, topic: str, url: str) -> bool:
+        """Atomically mark a URL's canonical form as visited; False if it was already claimed."""
+        key = url_canonicalizer.key(url)
+        with self._research_lock:
+            research = self.research_memory[topic]
+            if key in research.visited_urls:
+                url_canonicalizer.record_duplicate(url)
+                return False
+            research.add_visited(key)
+            return True
+
+    def _mark_fetched(self, topic: str, url: str):
+        """Also mark the rel=canonical target a fetched page declared, so mirrors of it are skipped."""
+        with self._research_lock:
+            self.research_memory[topic].add_visited(url_canonicalizer.key(url))
+
+    def _unvisited(self, topic: str, urls: List[str]) -> List[str]:
+        with self._research_lock:
+            visited = set(self.research_memory[topic].visited_urls)
+        fresh = []
+        for url in urls:
+            if url_canonicalizer.key(url) in visited:
+                url_canonicalizer.record_duplicate(url)
+            else:
+                fresh.append(url)
+        return fresh
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc
+        with self._research_lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_slots[host]
+
+    def _research_url(self, topic: str, url: str, plan: ResearchPlan, min_relevance: float,
+                      track_reliability: bool, stop_event: threading.Event = None) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """Fetch, assess and record one URL. Returns (assessment, accepted source or None)."""
+        def stopped():
+            return stop_event is not None and stop_event.is_set()
+
+        with self._host_slot(url):
+            if stopped() or not self._claim_url(topic, url):
+                return None, None
+            start_time = time.time()
+            content = fetch_webpage_content(url, self.provider, topic, plan.query_type, plan)
+            response_time = time.time() - start_time
+            self._mark_fetched(topic, url)
+
+        if stopped():
+            return None, None
+        if self.combined_assessment:
+            assessment, info = self.assess_and_extract(content, topic)
+        else:
+            assessment, info = self.assess_content_relevance(content, topic), None
+        success = assessment['relevance'] > min_relevance
+
+        if track_reliability:
+            with self._research_lock:
+                self.memory.update_source_reliability(
+                    domain=urlparse(url).netloc,
+                    query_type=plan.query_type,
+                    success=success,
+                    response_time=response_time,
+                    content_quality=assessment['relevance']
+                )
+
+        if not success or stopped():
+            return assessment, None
+
+        if info is None:
+            info = self.extract_key_information(content, topic)
+        current_source = {**assessment, **info}
+
+        with self._research_lock:
+            # Research may have been stopped while this worker was extracting
+            if stopped():
+                return assessment, None
+            self.research_memory.add_source(topic, url, content, current_source)
+        return assessment, current_source
+
+    def _research_batch(self, topic: str, urls: List[str], plan: ResearchPlan, min_relevance: float,
+                        track_reliability: bool, evaluate: Callable[[Dict, Dict], Optional[Dict]]) -> Optional[Dict]:
+        """Research a batch of URLs, sequentially or fanned out across workers.
+
+        evaluate(assessment, source) is called for every accepted source and
+        returns a research status; the batch ends as soon as one says stop.
+        Returns the last status produced, or None if no source was accepted.
+        """
+        status = None
+        if self.research_workers <= 1 or len(urls) <= 1:
+            for url in urls:
+                assessment, source = self._research_url(topic, url, plan, min_relevance, track_reliability)
+                if source is None:
+                    continue
+                status = evaluate(assessment, source) or status
+                if status and not status["continue"]:
+                    break
+            return status
+
+        stop_event = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=self.research_workers)
+        futures = {
+            executor.submit(self._research_url, topic, url, plan, min_relevance, track_reliability, stop_event): url
+            for url in urls
+        }
+        try:
+            for future in as_completed(futures):
+                try:
+                    assessment, source = future.result()
+                except Exception as e:
+                    logger.error(f"Error researching {futures[future]}: {str(e)}")
+                    continue
+                if source is None:
+                    continue
+                status = evaluate(assessment, source) or status
+                if status and not status["continue"]:
+                    stop_event.set()
+                    break
+        finally:
+            # Queued URLs are dropped; in-flight workers see the stop event and discard their results
+            executor.shutdown(wait=False, cancel_futures=True)
+        return status
+
+    def _priority_domain_url(self, topic: str, domain: str) -> Optional[str]:
+        search_results = rank_by_snippet(self.brave_search_run(f"site:{domain} {topic}"), topic)
+        urls = urls_from_results(search_results)
+        return urls[0] if urls else None
+
+    def _start_topic(self, topic: str):
+        self.research_memory.start(topic)
+
+    def _pending_priority_domains(self, topic: str) -> List[str]:
+        """Stock-price priority domains that have not yet produced a source for this topic."""
+        return [
+            domain for domain in PRIORITY_STOCK_DOMAINS
+            if not any(domain in s.url for s in self.research_memory[topic].sources)
+        ]
+
+    @staticmethod
+    def _reliable_price(assessment: Dict, source: Dict) -> Optional[Dict]:
+        if assessment['relevance'] > 0.8 and assessment['confidence'] > 0.8:
+            return {"continue": False, "reason": "Found reliable stock price"}
+        return None
+
+    def _continue_status(self, topic: str, plan: ResearchPlan) -> Callable[[Dict, Dict], Dict]:
+        def evaluate(assessment: Dict, source: Dict) -> Dict:
+            status = self.should_continue_research(topic, source, plan)
+            logger.info(f"Research status: {status['reason']}")
+            return status
+        return evaluate
+
+    @staticmethod
+    def _refine_query(search_query: str, research_status: Dict) -> str:
+        if research_status.get("priority") == "verification":
+            search_query += " facts verify source"
+        elif research_status.get("priority") == "context":
+            search_query += " background context"
+        return search_query
+
+    def _research_summary(self, topic: str, query_type: str) -> str:
+        with self._research_lock:
+            findings = self.research_memory[topic]
+            logger.info(f"Research memory footprint: {self.research_memory.footprint()}")
+            return f"""
+        === Research Summary ===
+        Query Type: {query_type}
+        Total Sources: {len(findings.sources)}
+        Key Facts Found: {json.dumps(findings.main_facts, indent=2)}
+        Sources: {json.dumps([{
+            'url': s.url,
+            'relevance': s.relevance,
+            'confidence': s.confidence,
+            'found_data': s.found_data
+        } for s in findings.sources], indent=2)}
+        """
+
+    def _site_queries(self, topic: str, plan: ResearchPlan) -> List[str]:
+        if not plan.has_label('stock_price'):
+            return []
+        return [f"site:{domain} {topic}" for domain in self._pending_priority_domains(topic)]
+
+    def _build_frontier(self, topic: str, plan: ResearchPlan,
+                        results: Dict[str, List[SearchResult]]) -> Tuple[List[str], List[str]]:
+        """Split speculative search results into priority-domain URLs and the ranked general frontier."""
+        priority = []
+        for query in self._site_queries(topic, plan):
+            urls = urls_from_results(rank_by_snippet(results.get(query, []), topic))
+            if urls:
+                priority.append(urls[0])
+
+        frontier = SearchFrontier()
+        for query in plan.search_queries:
+            frontier.add(rank_by_snippet(results.get(query, []), topic))
+        urls = self.memory.prioritize_urls(frontier.urls(), topic, plan.query_type)
+        logger.info(f"Search frontier: {len(urls)} candidates from {len(results)} queries, "
+                    f"{len(priority)} priority-domain URLs")
+        return priority, urls
+
+    def _next_round(self, topic: str, frontier: List[str], size: int) -> Tuple[List[str], List[str]]:
+        """Take the next size unvisited URLs off the frontier; returns (batch, rest)."""
+        frontier = self._unvisited(topic, frontier)
+        return frontier[:size], frontier[size:]
+
+    def _speculative_research(self, topic: str, plan: ResearchPlan):
+        """Send every search up front, then fetch from one merged frontier.
+
+        The query variants are sent unrefined: the verification/context
+        suffixes depend on results that do not exist yet.
+        """
+        queries = plan.search_queries + self._site_queries(topic, plan)
+        logger.info(f"Searching {len(queries)} queries concurrently")
+        with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+            results = dict(zip(queries, executor.map(self.brave_search_run, queries)))
+        priority, frontier = self._build_frontier(topic, plan, results)
+
+        research_status = {"continue": True, "reason": "Initial research"}
+        if priority:
+            status = self._research_batch(topic, priority, plan, 0.7, False, self._reliable_price)
+            research_status = status or research_status
+
+        continue_status = self._continue_status(topic, plan)
+        urls_per_round = max(2, self.research_workers)
+        for _ in plan.search_queries:
+            if not research_status["continue"]:
+                break
+            batch, frontier = self._next_round(topic, frontier, urls_per_round)
+            if not batch:
+                break
             try:
-                return self.brave_search.run(query)
-            except requests.HTTPError as e:
-                if e.response.status_code == 429:
-                    logger.warning("Hit rate limit. Waiting before retry...")
-                    time.sleep((i+1)*2)
-                else:
-                    logger.error(f"HTTP Error during Brave search: {str(e)}")
-                    time.sleep(2)
-            except Exception as ex:
-                logger.error(f"Error in Brave search: {str(ex)}")
-                time.sleep(2)
-        return ""
+                status = self._research_batch(topic, batch, plan, 0.5, True, continue_status)
+                research_status = status or research_status
+            except Exception as e:
+                logger.error(f"Error in research iteration: {str(e)}")
 
     def fetch_additional_info(self, topic: str) -> str:
         self.current_topic = topic
-        query_type = self.memory.categorize_query(topic)
-        
-        if topic not in self.research_memory:
-            self.research_memory[topic] = {
-                'sources': [],
-                'main_facts': [],
-                'last_update': time.time(),
-                'visited_urls': set()
-            }
+        plan = self.plan_research(topic)
+        query_type = plan.query_type
+        self._start_topic(topic)
+
+        if self.speculative_search:
+            self._speculative_research(topic, plan)
+            return self._research_summary(topic, query_type)
 
         all_research = []
         research_status = {"continue": True, "reason": "Initial research"}
         
-        if query_type == 'stock_price':
-            priority_domains = [
-                'marketwatch.com',
-                'finance.yahoo.com',
-                'bloomberg.com',
-                'reuters.com'
-            ]
-            
-            for domain in priority_domains:
-                if any(domain in s.get('url', '') for s in self.research_memory[topic]['sources']):
-                    continue
-                    
-                search_query = f"site:{domain} {topic}"
-                search_results = self.brave_search_run(search_query)
-                urls = extract_urls_from_search_results(search_results)
-                
-                if urls:
-                    url = urls[0]
-                    if url not in self.research_memory[topic]['visited_urls']:
-                        self.research_memory[topic]['visited_urls'].add(url)
-                        content = fetch_webpage_content(url, self.provider, topic)
-                        
-                        assessment = self.assess_content_relevance(content, topic)
-                        if assessment['relevance'] > 0.7:
-                            info = self.extract_key_information(content, topic)
-                            current_source = {**assessment, **info}
-                            
-                            self.research_memory[topic]['sources'].append({
-                                'url': url,
-                                'content': content,
-                                **current_source
-                            })
-                            self.research_memory[topic]['main_facts'].extend(info['main_facts'])
-                            
-                            if assessment['relevance'] > 0.8 and assessment['confidence'] > 0.8:
-                                research_status = {"continue": False, "reason": "Found reliable stock price"}
-                                break
+        if plan.has_label('stock_price'):
+            priority_domains = self._pending_priority_domains(topic)
+            reliable_price = self._reliable_price
 
+            if self.research_workers > 1:
+                with ThreadPoolExecutor(max_workers=self.research_workers) as executor:
+                    candidates = list(executor.map(lambda d: self._priority_domain_url(topic, d), priority_domains))
+                candidates = [url for url in candidates if url]
+                status = self._research_batch(topic, candidates, plan, 0.7, False, reliable_price)
+                research_status = status or research_status
+            else:
+                for domain in priority_domains:
+                    url = self._priority_domain_url(topic, domain)
+                    if not url:
+                        continue
+                    status = self._research_batch(topic, [url], plan, 0.7, False, reliable_price)
+                    if status and not status["continue"]:
+                        research_status = status
+                        break
+
+        continue_status = self._continue_status(topic, plan)
+        urls_per_round = max(2, self.research_workers)
         search_attempts = 0
-        max_search_attempts = 3
+        max_search_attempts = len(plan.search_queries)
         
         while research_status["continue"] and search_attempts < max_search_attempts:
             try:
-                if search_attempts == 0:
-                    search_query = topic
-                elif search_attempts == 1:
-                    search_query = f"{topic} latest information"
-                else:
-                    search_query = f"{topic} current data {datetime.now().strftime('%Y')}"
-
-                if research_status.get("priority") == "verification":
-                    search_query += " facts verify source"
-                elif research_status.get("priority") == "context":
-                    search_query += " background context"
+                search_query = self._refine_query(plan.search_queries[search_attempts], research_status)
                 
                 logger.info(f"Searching with query: {search_query}")
-                results = self.brave_search_run(search_query)
-                urls = extract_urls_from_search_results(results)
+                results = rank_by_snippet(self.brave_search_run(search_query), topic)
+                urls = urls_from_results(results)
                 
-                urls = [url for url in urls if url not in self.research_memory[topic]['visited_urls']]
+                urls = self._unvisited(topic, urls)
                 
                 if not urls:
                     search_attempts += 1
                     continue
                 
-                urls = self.memory.prioritize_urls(urls, topic)
+                urls = self.memory.prioritize_urls(urls, topic, plan.query_type)
                 
-                for url in urls[:2]:
-                    if url in self.research_memory[topic]['visited_urls']:
-                        continue
-                        
-                    self.research_memory[topic]['visited_urls'].add(url)
-                    start_time = time.time()
-                    content = fetch_webpage_content(url, self.provider, topic)
-                    response_time = time.time() - start_time
-                    
-                    assessment = self.assess_content_relevance(content, topic)
-                    domain = urlparse(url).netloc
-                    
-                    success = assessment['relevance'] > 0.5
-                    self.memory.update_source_reliability(
-                        domain=domain,
-                        query_type=query_type,
-                        success=success,
-                        response_time=response_time,
-                        content_quality=assessment['relevance']
-                    )
-                    
-                    if success:
-                        info = self.extract_key_information(content, topic)
-                        current_source = {**assessment, **info}
-                        
-                        self.research_memory[topic]['sources'].append({
-                            'url': url,
-                            'content': content,
-                            **current_source
-                        })
-                        self.research_memory[topic]['main_facts'].extend(info['main_facts'])
-                        
-                        research_status = self.should_continue_research(topic, current_source)
-                        logger.info(f"Research status: {research_status['reason']}")
-                        
-                        if not research_status["continue"]:
-                            break
+                status = self._research_batch(topic, urls[:urls_per_round], plan, 0.5, True, continue_status)
+                research_status = status or research_status
                 
                 if not research_status["continue"]:
                     break
@@ -359,25 +663,12 @@ class WebAgent:
                 logger.error(f"Error in research iteration: {str(e)}")
                 search_attempts += 1
 
-        all_research.append(f"""
-        === Research Summary ===
-        Query Type: {query_type}
-        Total Sources: {len(self.research_memory[topic]['sources'])}
-        Key Facts Found: {json.dumps(self.research_memory[topic]['main_facts'], indent=2)}
-        Sources: {json.dumps([{
-            'url': s['url'],
-            'relevance': s.get('relevance', 0),
-            'confidence': s.get('confidence', 0),
-            'found_data': s.get('found_data', '')
-        } for s in self.research_memory[topic]['sources']], indent=2)}
-        """)
+        all_research.append(self._research_summary(topic, query_type))
 
         return "\n\n".join(all_research)
 
-    def generate_report(self, topic: str) -> str:
-        additional_info = self.fetch_additional_info(topic)
-        
-        enhanced_prompt = f"""
+    def _report_prompt(self, topic: str, additional_info: str) -> str:
+        return f"""
         Generate a  report based on the research findings.
         Focus on the most relevant and current information.
         
@@ -391,16 +682,240 @@ class WebAgent:
         4. Cite sources where appropriate
         
         Report:"""
+
+    def generate_report(self, topic: str) -> str:
+        additional_info = self.fetch_additional_info(topic)
+        enhanced_prompt = self._report_prompt(topic, additional_info)
         
         for attempt in range(self.max_retries):
             try:
-                report = invoke_model(self.llm, enhanced_prompt)
+                report = invoke_model(self.llm, enhanced_prompt, use_cache=False)
                 return report.content
             except Exception as e:
                 if attempt == self.max_retries - 1:
                     return f"Error generating report: {str(e)}"
                 time.sleep(self.retry_delay)
 
+    def generate_report_stream(self, topic: str) -> Iterator[str]:
+        """Streaming variant of generate_report: yields the report text as it is generated.
+
+        Failures before the first token are retried like generate_report.
+        After that the partial report has already been shown, so a failure
+        ends the stream with a note instead of starting over.
+        """
+        additional_info = self.fetch_additional_info(topic)
+        enhanced_prompt = self._report_prompt(topic, additional_info)
+
+        for attempt in range(self.max_retries):
+            started = False
+            try:
+                for token in invoke_model_stream(self.llm, enhanced_prompt):
+                    started = True
+                    yield token
+                return
+            except Exception as e:
+                if started:
+                    logger.error(f"Report stream interrupted: {str(e)}")
+                    yield f"\n\n[Report interrupted: {str(e)}]"
+                    return
+                if attempt == self.max_retries - 1:
+                    yield f"Error generating report: {str(e)}"
+                    return
+                time.sleep(self.retry_delay)
+
+    async def abrave_search_run(self, client: httpx.AsyncClient, query: str, retries: int = 3) -> List[SearchResult]:
+        """Async counterpart of brave_search_run."""
+        if not BRAVE_API_KEY:
+            logger.error("Brave Search API key not set. Unable to perform search.")
+            return []
+        try:
+            return await self.brave_search.asearch(client, query, retries=retries)
+        except Exception as e:
+            logger.error(f"Error in Brave search: {str(e)}")
+            return []
+
+    async def _aresearch_url(self, topic: str, url: str, plan: ResearchPlan, min_relevance: float,
+                             track_reliability: bool, limiter: asyncio.Semaphore) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """Async counterpart of _research_url; Selenium work runs in the default executor."""
+        if not self._claim_url(topic, url):
+            return None, None
+        loop = asyncio.get_running_loop()
+        async with limiter:
+            start_time = time.time()
+            content = await loop.run_in_executor(
+                None, fetch_webpage_content, url, self.provider, topic, plan.query_type, plan)
+            response_time = time.time() - start_time
+            self._mark_fetched(topic, url)
+
+        async with limiter:
+            if self.combined_assessment:
+                assessment, info = await self.aassess_and_extract(content, topic)
+            else:
+                assessment, info = await asyncio.to_thread(self.assess_content_relevance, content, topic), None
+        success = assessment['relevance'] > min_relevance
+
+        if track_reliability:
+            with self._research_lock:
+                self.memory.update_source_reliability(
+                    domain=urlparse(url).netloc,
+                    query_type=plan.query_type,
+                    success=success,
+                    response_time=response_time,
+                    content_quality=assessment['relevance']
+                )
+        if not success:
+            return assessment, None
+
+        if info is None:
+            async with limiter:
+                info = await asyncio.to_thread(self.extract_key_information, content, topic)
+        current_source = {**assessment, **info}
+        with self._research_lock:
+            self.research_memory.add_source(topic, url, content, current_source)
+        return assessment, current_source
+
+    async def _aresearch_batch(self, topic: str, urls: List[str], plan: ResearchPlan, min_relevance: float,
+                               track_reliability: bool, evaluate: Callable[[Dict, Dict], Optional[Dict]],
+                               limiter: asyncio.Semaphore, host_slots: Dict[str, asyncio.Semaphore]) -> Optional[Dict]:
+        """Research URLs as concurrent tasks; cancels the rest once evaluate says stop."""
+        async def research(url: str):
+            slot = host_slots.setdefault(urlparse(url).netloc, asyncio.Semaphore(self.per_host_limit))
+            async with slot:
+                return await self._aresearch_url(topic, url, plan, min_relevance, track_reliability, limiter)
+
+        tasks = [asyncio.create_task(research(url)) for url in urls]
+        status = None
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    assessment, source = await next_done
+                except Exception as e:
+                    logger.error(f"Error in async research task: {str(e)}")
+                    continue
+                if source is None:
+                    continue
+                status = evaluate(assessment, source) or status
+                if status and not status["continue"]:
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return status
+
+    async def afetch_additional_info(self, topic: str) -> str:
+        """Async counterpart of fetch_additional_info.
+
+        Searches, page fetches and assessments run as overlapping coroutines,
+        never more than self.async_concurrency at a time.
+        """
+        self.current_topic = topic
+        plan = await asyncio.to_thread(self.plan_research, topic)
+        query_type = plan.query_type
+        self._start_topic(topic)
+
+        limiter = asyncio.Semaphore(self.async_concurrency)
+        host_slots: Dict[str, asyncio.Semaphore] = {}
+        research_status = {"continue": True, "reason": "Initial research"}
+
+        async with httpx.AsyncClient(timeout=httpx.Timeout(20.0)) as client:
+            async def limited_search(query: str):
+                async with limiter:
+                    return await self.abrave_search_run(client, query)
+
+            async def search(query: str) -> List[str]:
+                results = await limited_search(query)
+                return urls_from_results(rank_by_snippet(results, topic))
+
+            if self.speculative_search:
+                queries = plan.search_queries + self._site_queries(topic, plan)
+                logger.info(f"Searching {len(queries)} queries concurrently")
+                found = await asyncio.gather(*(limited_search(query) for query in queries))
+                priority, frontier = self._build_frontier(topic, plan, dict(zip(queries, found)))
+                if priority:
+                    status = await self._aresearch_batch(topic, priority, plan, 0.7, False, self._reliable_price,
+                                                         limiter, host_slots)
+                    research_status = status or research_status
+
+                continue_status = self._continue_status(topic, plan)
+                urls_per_round = max(2, self.async_concurrency)
+                for _ in plan.search_queries:
+                    if not research_status["continue"]:
+                        break
+                    batch, frontier = self._next_round(topic, frontier, urls_per_round)
+                    if not batch:
+                        break
+                    try:
+                        status = await self._aresearch_batch(topic, batch, plan, 0.5, True, continue_status,
+                                                             limiter, host_slots)
+                        research_status = status or research_status
+                    except Exception as e:
+                        logger.error(f"Error in research iteration: {str(e)}")
+                return self._research_summary(topic, query_type)
+
+            if plan.has_label('stock_price'):
+                searches = [search(f"site:{domain} {topic}") for domain in self._pending_priority_domains(topic)]
+                candidates = [urls[0] for urls in await asyncio.gather(*searches) if urls]
+                status = await self._aresearch_batch(topic, candidates, plan, 0.7, False, self._reliable_price,
+                                                     limiter, host_slots)
+                research_status = status or research_status
+
+            continue_status = self._continue_status(topic, plan)
+            urls_per_round = max(2, self.async_concurrency)
+            for base_query in plan.search_queries:
+                if not research_status["continue"]:
+                    break
+                try:
+                    search_query = self._refine_query(base_query, research_status)
+                    logger.info(f"Searching with query: {search_query}")
+                    urls = self._unvisited(topic, await search(search_query))
+                    if not urls:
+                        continue
+                    urls = self.memory.prioritize_urls(urls, topic, plan.query_type)
+                    status = await self._aresearch_batch(topic, urls[:urls_per_round], plan, 0.5, True,
+                                                         continue_status, limiter, host_slots)
+                    research_status = status or research_status
+                except Exception as e:
+                    logger.error(f"Error in research iteration: {str(e)}")
+
+        return self._research_summary(topic, query_type)
+
+    async def agenerate_report(self, topic: str) -> str:
+        """Async counterpart of generate_report."""
+        additional_info = await self.afetch_additional_info(topic)
+        enhanced_prompt = self._report_prompt(topic, additional_info)
+
+        for attempt in range(self.max_retries):
+            try:
+                report = await ainvoke_model(self.llm, enhanced_prompt, use_cache=False)
+                return report.content
+            except Exception as e:
+                if attempt == self.max_retries - 1:
+                    return f"Error generating report: {str(e)}"
+                await asyncio.sleep(self.retry_delay)
+
+    async def agenerate_report_stream(self, topic: str) -> AsyncIterator[str]:
+        """Async counterpart of generate_report_stream."""
+        additional_info = await self.afetch_additional_info(topic)
+        enhanced_prompt = self._report_prompt(topic, additional_info)
+
+        for attempt in range(self.max_retries):
+            started = False
+            try:
+                async for token in ainvoke_model_stream(self.llm, enhanced_prompt):
+                    started = True
+                    yield token
+                return
+            except Exception as e:
+                if started:
+                    logger.error(f"Report stream interrupted: {str(e)}")
+                    yield f"\n\n[Report interrupted: {str(e)}]"
+                    return
+                if attempt == self.max_retries - 1:
+                    yield f"Error generating report: {str(e)}"
+                    return
+                await asyncio.sleep(self.retry_delay)
+
     def assess_research_accuracy(self, topic: str, research_data: Dict) -> Dict:
         assessment_prompt = f"""Analyze the research results for accuracy and completeness.
         Consider:
@@ -457,13 +972,16 @@ class WebAgent:
             logger.error("No current research assessment available")
             return
             
-        sources = [s['url'] for s in self.research_memory.get(topic, {}).get('sources', [])]
+        research = self.research_memory.get(topic)
+        sources = [s.url for s in research.sources] if research else []
+        plan = self.research_plans.get(topic)
         self.memory.record_feedback(
             topic=topic,
             sources=sources,
             agent_assessment=self.current_assessment,
             human_feedback=is_accurate,
-            notes=notes
+            notes=notes,
+            query_type=plan.query_type if plan else None
         )
         
         self.current_assessment = None
\ No newline at end of file
@@ -4,4 +4,97 @@ from dotenv import load_dotenv
 load_dotenv()
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-BRAVE_API_KEY = os.getenv("BRAVE_API_KEY")
\ No newline at end of file
+BRAVE_API_KEY = os.getenv("BRAVE_API_KEY")
+# Overridable so the offline stub in test/brave_stub.py can stand in for the real API
+BRAVE_SEARCH_URL = os.getenv("BRAVE_SEARCH_URL", "https://api.search.brave.com/res/v1/web/search")
+
+# Headless Chrome session pool
+DRIVER_POOL_SIZE = int(os.getenv("DRIVER_POOL_SIZE", "2"))
+DRIVER_MAX_PAGES = int(os.getenv("DRIVER_MAX_PAGES", "25"))
+DRIVER_MAX_MEMORY_MB = int(os.getenv("DRIVER_MAX_MEMORY_MB", "512"))
+DRIVER_LEASE_TIMEOUT = float(os.getenv("DRIVER_LEASE_TIMEOUT", "120"))
+
+# Concurrent research fan-out (1 keeps the sequential loop)
+RESEARCH_WORKERS = int(os.getenv("RESEARCH_WORKERS", "2"))
+RESEARCH_PER_HOST_LIMIT = int(os.getenv("RESEARCH_PER_HOST_LIMIT", "1"))
+
+# Page readiness (upper bound and quiet period, in seconds)
+PAGE_READY_TIMEOUT = float(os.getenv("PAGE_READY_TIMEOUT", "5"))
+PAGE_QUIET_WINDOW = float(os.getenv("PAGE_QUIET_WINDOW", "0.5"))
+
+# Text-first extraction ("auto" tries page text before the vision model, "vision" always screenshots)
+EXTRACTION_MODE = os.getenv("EXTRACTION_MODE", "auto").lower()
+TEXT_MIN_SCORE = float(os.getenv("TEXT_MIN_SCORE", "0.6"))
+TEXT_MIN_WORDS = int(os.getenv("TEXT_MIN_WORDS", "150"))
+TEXT_MAX_CHARS = int(os.getenv("TEXT_MAX_CHARS", "8000"))
+
+# On-disk page content cache; TTLs in seconds per ResearchMemory.categorize_query category
+PAGE_CACHE_PATH = os.getenv("PAGE_CACHE_PATH", ".cache/page_cache.sqlite")
+PAGE_CACHE_MAX_MB = float(os.getenv("PAGE_CACHE_MAX_MB", "256"))
+PAGE_CACHE_TTLS = {
+    'stock_price': 5 * 60,
+    'news': 30 * 60,
+    'financial_data': 6 * 3600,
+    'general': 24 * 3600,
+    'technical': 3 * 86400,
+    'company_info': 7 * 86400
+}
+
+# LLM response memoization; set LLM_CACHE_PATH to keep responses across runs
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "512"))
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "")
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(24 * 3600)))
+
+# Assess relevance and extract facts in one model call (falls back to two calls on bad output)
+COMBINED_ASSESSMENT = os.getenv("COMBINED_ASSESSMENT", "true").lower() == "true"
+
+# Asyncio research pipeline (WebAgent.agenerate_report)
+ASYNC_RESEARCH = os.getenv("ASYNC_RESEARCH", "false").lower() == "true"
+ASYNC_CONCURRENCY = int(os.getenv("ASYNC_CONCURRENCY", "4"))
+
+# Upper bound on the encoded screenshot sent to the vision model (bytes, before base64)
+VISION_PAYLOAD_MAX_BYTES = int(os.getenv("VISION_PAYLOAD_MAX_BYTES", str(1024 * 1024)))
+
+# Screenshot mode: "roi" sends only topic-matching regions (full page if none match), "full" always sends the page
+SCREENSHOT_MODE = os.getenv("SCREENSHOT_MODE", "roi").lower()
+ROI_MAX_REGIONS = int(os.getenv("ROI_MAX_REGIONS", "6"))
+ROI_PADDING = int(os.getenv("ROI_PADDING", "16"))
+
+# Hard time budget for the in-page DOM normalization pass (milliseconds)
+NORMALIZE_BUDGET_MS = float(os.getenv("NORMALIZE_BUDGET_MS", "250"))
+
+# Research memory storage: "sqlite" (row-level writes, migrates agent_memory.json) or "json"
+MEMORY_BACKEND = os.getenv("MEMORY_BACKEND", "sqlite").lower()
+MEMORY_FLUSH_INTERVAL = float(os.getenv("MEMORY_FLUSH_INTERVAL", "5"))
+MEMORY_FLUSH_BATCH = int(os.getenv("MEMORY_FLUSH_BATCH", "20"))
+
+# Source reliability decays with time since the last success (half-life in days)
+SOURCE_DECAY_HALF_LIFE_DAYS = float(os.getenv("SOURCE_DECAY_HALF_LIFE_DAYS", "30"))
+
+# Optional JSON file of {category: regex} replacing the built-in query categories
+QUERY_CATEGORIES_FILE = os.getenv("QUERY_CATEGORIES_FILE", "")
+
+# Host circuit breaker: consecutive failures before backing off, backoff window bounds (seconds)
+HOST_FAILURE_THRESHOLD = int(os.getenv("HOST_FAILURE_THRESHOLD", "2"))
+HOST_BACKOFF_BASE = float(os.getenv("HOST_BACKOFF_BASE", "60"))
+HOST_BACKOFF_MAX = float(os.getenv("HOST_BACKOFF_MAX", "86400"))
+HOST_HEALTH_PATH = os.getenv("HOST_HEALTH_PATH", ".cache/host_health.json")
+HOST_SNAPSHOT_INTERVAL = float(os.getenv("HOST_SNAPSHOT_INTERVAL", "60"))
+
+# Brave search: request rate of the API plan, longest wait before a retry, and the search result cache
+BRAVE_QPS = float(os.getenv("BRAVE_QPS", "1"))
+BRAVE_BURST = int(os.getenv("BRAVE_BURST", "1"))
+BRAVE_MAX_RETRY_DELAY = float(os.getenv("BRAVE_MAX_RETRY_DELAY", "30"))
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "3600"))
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "256"))
+
+# Send all search query variants (and site: priority queries) at once and fetch from one merged frontier
+SPECULATIVE_SEARCH = os.getenv("SPECULATIVE_SEARCH", "true").lower() == "true"
+
+# In-process research memory bounds; accepted page content is spilled to files under TOPIC_SPILL_DIR
+TOPIC_STORE_MAX_TOPICS = int(os.getenv("TOPIC_STORE_MAX_TOPICS", "32"))
+TOPIC_STORE_MAX_MB = float(os.getenv("TOPIC_STORE_MAX_MB", "64"))
+TOPIC_SPILL_DIR = os.getenv("TOPIC_SPILL_DIR", ".cache/research_spill")
+
+# Print the report token by token as the model generates it
+STREAM_REPORT = os.getenv("STREAM_REPORT", "true").lower() == "true"
\ No newline at end of file
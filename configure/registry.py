@@ -0,0 +1,112 @@
+from langchain_groq import ChatGroq
+from langchain_ollama import ChatOllama
+from Model.provider import ModelProvider
+from config.settings import GROQ_API_KEY
+from config.log import logger
+from contextlib import contextmanager
+from typing import Dict, Union
+import threading
+import httpx
+import time
+
+
+class ModelRegistry:
+    """Process-wide cache of chat model clients, one per (provider, model, params).
+
+    Groq clients share one keep-alive httpx connection pool; a reused
+    ChatOllama keeps its own pooled client to the Ollama server.
+    """
+
+    def __init__(self):
+        self._clients = {}
+        self._labels = {}
+        self._http_clients = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def http_client(self, provider: str) -> httpx.Client:
+        """Shared keep-alive HTTP client for a provider's API."""
+        with self._lock:
+            if provider not in self._http_clients:
+                self._http_clients[provider] = httpx.Client(
+                    timeout=httpx.Timeout(120.0, connect=10.0),
+                    limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
+                )
+            return self._http_clients[provider]
+
+    def _build(self, provider: str, model: str, params: Dict) -> Union[ChatOllama, ChatGroq]:
+        if provider == ModelProvider.OLLAMA:
+            return ChatOllama(model=model, **params)
+        return ChatGroq(
+            model=model,
+            groq_api_key=GROQ_API_KEY,
+            http_client=self.http_client(provider),
+            **params
+        )
+
+    def get(self, provider: str, model: str, **params) -> Union[ChatOllama, ChatGroq]:
+        """Return the shared client for this configuration, building it on first use."""
+        key = (provider, model, tuple(sorted((name, repr(value)) for name, value in params.items())))
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+        if provider != ModelProvider.OLLAMA:
+            # Build the shared HTTP client outside the registry lock
+            self.http_client(provider)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._build(provider, model, params)
+                label = f"{provider}:{model}"
+                if any(existing == label for existing in self._labels.values()):
+                    label = f"{label}#{len(self._clients)}"
+                self._clients[key] = client
+                self._labels[id(client)] = label
+                self._stats[label] = {'calls': 0, 'errors': 0, 'total_latency': 0.0, 'max_latency': 0.0,
+                                      'streams': 0, 'total_ttft': 0.0, 'max_ttft': 0.0}
+                logger.info(f"Registered model client {label}")
+        return client
+
+    @contextmanager
+    def track(self, client):
+        """Time one call on a registered client and record it in the per-client stats."""
+        start = time.time()
+        failed = False
+        try:
+            yield
+        except Exception:
+            failed = True
+            raise
+        finally:
+            elapsed = time.time() - start
+            with self._lock:
+                label = self._labels.get(id(client))
+                if label is not None:
+                    stats = self._stats[label]
+                    stats['calls'] += 1
+                    stats['errors'] += int(failed)
+                    stats['total_latency'] += elapsed
+                    stats['max_latency'] = max(stats['max_latency'], elapsed)
+
+    def record_first_token(self, client, elapsed: float):
+        """Record a streamed call's time to first token."""
+        with self._lock:
+            label = self._labels.get(id(client))
+            if label is not None:
+                stats = self._stats[label]
+                stats['streams'] += 1
+                stats['total_ttft'] += elapsed
+                stats['max_ttft'] = max(stats['max_ttft'], elapsed)
+        logger.info(f"Time to first token: {elapsed:.2f}s")
+
+    def stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                label: {**stats,
+                        'avg_latency': stats['total_latency'] / stats['calls'] if stats['calls'] else 0.0,
+                        'avg_ttft': stats['total_ttft'] / stats['streams'] if stats['streams'] else 0.0}
+                for label, stats in self._stats.items()
+            }
+
+
+model_registry = ModelRegistry()
\ No newline at end of file
@@ -2,13 +2,14 @@ from langchain_groq import ChatGroq
 from langchain_ollama import ChatOllama
 from Model.provider import ModelProvider
 from typing import Union
-from config.settings import GROQ_API_KEY
+from configure.registry import model_registry
 
 def configure_vision_model(provider: str) -> Union[ChatOllama, ChatGroq]:
-    """Configure vision model based on selected provider."""
+    """Return the shared vision model client for the selected provider."""
     if provider == ModelProvider.OLLAMA:
-        return ChatOllama(
-            model="llama3.2-vision:11b",
+        return model_registry.get(
+            provider,
+            "llama3.2-vision:11b",
             base_url="http://localhost:11434",
             temperature=0.5,
             num_gpu=1,
@@ -17,8 +18,8 @@ def configure_vision_model(provider: str) -> Union[ChatOllama, ChatGroq]:
             f16=True
         )
     else:
-        return ChatGroq(
-            model="llama-3.2-90b-vision-preview",
-            temperature=0.5,
-            groq_api_key=GROQ_API_KEY
+        return model_registry.get(
+            provider,
+            "llama-3.2-90b-vision-preview",
+            temperature=0.5
         )
\ No newline at end of file
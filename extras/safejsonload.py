@@ -11,4 +11,19 @@ def safe_json_loads(json_str: str, fallback: Dict, content: str = "") -> Dict:
             return json.loads(fixed)
         except json.JSONDecodeError:
             logger.error("Still can't parse JSON after fix.")
-            return fallback
\ No newline at end of file
+            return fallback
+
+def validate_schema(data: Dict, schema: Dict) -> bool:
+    """Check that data has every schema field with a value of the expected type(s)."""
+    if not isinstance(data, dict):
+        return False
+    for field, expected in schema.items():
+        if field not in data:
+            return False
+        value = data[field]
+        # bool is a subclass of int; don't accept true/false where a number is expected
+        if isinstance(value, bool) and expected is not bool and bool not in (expected if isinstance(expected, tuple) else (expected,)):
+            return False
+        if not isinstance(value, expected):
+            return False
+    return True
\ No newline at end of file
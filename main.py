@@ -4,10 +4,12 @@ import sys
 from Model.provider import ModelProvider
 from test.test_model import test_model_provider
 from configure.llama import configure_llama
-from config.settings import BRAVE_API_KEY
-from langchain_community.tools import BraveSearch, WikipediaQueryRun
+from config.settings import BRAVE_API_KEY, ASYNC_RESEARCH, STREAM_REPORT
+from langchain_community.tools import WikipediaQueryRun
+from tools.brave_search import BraveClient
 from langchain_community.utilities.wikipedia import WikipediaAPIWrapper
 from agent.web_agent import WebAgent
+import asyncio
 import time
 import warnings
 
@@ -28,6 +30,29 @@ def print_banner():
 def print_separator():
     print("=" * 80)
 
+def print_response_header():
+    print("\n📜 Response:")
+    print_separator()
+
+def render_stream(tokens) -> str:
+    """Print report tokens as they arrive; the header waits for the first one so research output stays above it."""
+    parts = []
+    for token in tokens:
+        if not parts:
+            print_response_header()
+        print(token, end="", flush=True)
+        parts.append(token)
+    return "".join(parts)
+
+async def arender_stream(tokens) -> str:
+    parts = []
+    async for token in tokens:
+        if not parts:
+            print_response_header()
+        print(token, end="", flush=True)
+        parts.append(token)
+    return "".join(parts)
+
 def main():
     print_banner()
     print("Initializing SurfAgent...")
@@ -55,14 +80,14 @@ def main():
         logger.warning("Brave Search API key not set. Searches will not return results.")
         print("Warning: Brave Search API key not found. Limited functionality.")
     
-    brave_search = BraveSearch.from_api_key(
-        api_key=BRAVE_API_KEY,
-        search_kwargs={"count": 6}
-    )
+    brave_search = BraveClient(count=6)
     wikipedia = WikipediaQueryRun(api_wrapper=WikipediaAPIWrapper())
     retriever = None
     agent = WebAgent(retriever, llm, prompt, brave_search, wikipedia, provider)
     
+    # One loop for the whole session: shared model clients keep async connections bound to it
+    loop = asyncio.new_event_loop() if ASYNC_RESEARCH else None
+    
     print("SurfAgent is ready to assist you! 🚀\n")
     print_separator()
     
@@ -78,12 +103,24 @@ def main():
                 continue
             logger.info(f"Starting research for topic: {topic}")
             print(f"\n🔍 Researching: {topic}...")
-            report = agent.generate_report(topic)
-            
-            print("\n📜 Response:")
-            print_separator()
-            print(report)
-            print_separator()
+            if STREAM_REPORT:
+                if ASYNC_RESEARCH:
+                    report = loop.run_until_complete(arender_stream(agent.agenerate_report_stream(topic)))
+                else:
+                    report = render_stream(agent.generate_report_stream(topic))
+                if not report:
+                    print_response_header()
+                print()
+                print_separator()
+            else:
+                if ASYNC_RESEARCH:
+                    report = loop.run_until_complete(agent.agenerate_report(topic))
+                else:
+                    report = agent.generate_report(topic)
+                
+                print_response_header()
+                print(report)
+                print_separator()
             
             feedback = input("\n✅ Was this information accurate? (y/n): ").lower().strip()
             if feedback in ['y', 'n']:
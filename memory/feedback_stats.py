@@ -0,0 +1,115 @@
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+RECENT_TRENDS = 10
+
+
+class FeedbackBucket:
+    """Running counters for one (domain, query type) slice of the feedback history."""
+    __slots__ = ('total', 'correct', 'agreed', 'query_types', 'daily', 'recent')
+
+    def __init__(self):
+        self.total = 0
+        self.correct = 0
+        self.agreed = 0
+        # query type -> [total, successful]
+        self.query_types: Dict[str, List[int]] = {}
+        # YYYY-MM-DD -> [total, correct, agreed]
+        self.daily: Dict[str, List[int]] = {}
+        self.recent = deque(maxlen=RECENT_TRENDS)
+
+    def add(self, entry: Dict, correct: bool):
+        agreed = bool(entry['human_feedback'])
+        self.total += 1
+        self.correct += correct
+        self.agreed += agreed
+
+        counts = self.query_types.setdefault(entry['query_type'], [0, 0])
+        counts[0] += 1
+        counts[1] += agreed
+
+        day = self.daily.setdefault(entry['timestamp'][:10], [0, 0, 0])
+        day[0] += 1
+        day[1] += correct
+        day[2] += agreed
+
+        self.recent.append({
+            'timestamp': entry['timestamp'],
+            'query_type': entry['query_type'],
+            'success': entry['human_feedback']
+        })
+
+
+def entry_domains(sources: List[str]) -> List[str]:
+    """Hosts of an entry's sources plus their parent domains (finance.yahoo.com -> yahoo.com)."""
+    domains = set()
+    for source in sources:
+        host = (urlparse(source).netloc or source).lower().split(':')[0]
+        labels = host.split('.')
+        for i in range(len(labels) - 1):
+            domains.add('.'.join(labels[i:]))
+    return sorted(domains)
+
+
+class FeedbackIndex:
+    """Feedback aggregates maintained as entries arrive, so stats never rescan the history.
+
+    Every entry updates four buckets: overall, its query type, each of its
+    domains, and each (domain, query type) pair.
+    """
+
+    def __init__(self):
+        self._buckets: Dict[Tuple[Optional[str], Optional[str]], FeedbackBucket] = {}
+        self._domain_entries: Dict[str, List[Dict]] = {}
+
+    def _bucket(self, domain: Optional[str], query_type: Optional[str]) -> FeedbackBucket:
+        key = (domain, query_type)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = FeedbackBucket()
+        return bucket
+
+    def add(self, entry: Dict):
+        correct = entry['agent_assessment'].get('is_accurate') == entry['human_feedback']
+        query_type = entry['query_type']
+        self._bucket(None, None).add(entry, correct)
+        self._bucket(None, query_type).add(entry, correct)
+        for domain in entry_domains(entry['sources']):
+            self._bucket(domain, None).add(entry, correct)
+            self._bucket(domain, query_type).add(entry, correct)
+            self._domain_entries.setdefault(domain, []).append(entry)
+
+    def stats(self, domain: str = None, query_type: str = None) -> Dict:
+        stats = {
+            'total_entries': 0,
+            'agent_accuracy': 0.0,
+            'human_agreement': 0.0,
+            'query_type_performance': {},
+            'recent_trends': []
+        }
+        bucket = self._buckets.get((domain.lower() if domain else None, query_type))
+        if bucket is None or not bucket.total:
+            return stats
+
+        stats['total_entries'] = bucket.total
+        stats['agent_accuracy'] = bucket.correct / bucket.total
+        stats['human_agreement'] = bucket.agreed / bucket.total
+        stats['query_type_performance'] = {
+            qt: {'success_rate': successful / total}
+            for qt, (total, successful) in bucket.query_types.items()
+        }
+        stats['recent_trends'] = list(bucket.recent)
+        return stats
+
+    def daily(self, domain: str = None, query_type: str = None, days: int = 7) -> List[Dict]:
+        bucket = self._buckets.get((domain.lower() if domain else None, query_type))
+        if bucket is None:
+            return []
+        return [
+            {'date': date, 'total': total, 'agent_accuracy': correct / total, 'human_agreement': agreed / total}
+            for date, (total, correct, agreed) in sorted(bucket.daily.items())[-days:]
+        ]
+
+    def entries_for_domain(self, domain: str) -> List[Dict]:
+        return list(self._domain_entries.get(domain.lower(), []))
@@ -0,0 +1,99 @@
+from config.log import logger
+from config.settings import QUERY_CATEGORIES_FILE
+from functools import lru_cache
+from typing import Dict, List, Tuple
+import json
+import re
+
+FALLBACK_CATEGORY = 'general'
+
+# Checked in order: the first category that matches is the primary label.
+# Patterns are matched case-insensitively and must not carry inline flags.
+DEFAULT_QUERY_CATEGORIES = {
+    'stock_price': r'(?:stock|share)\s+price|price\s+of\s+stock',
+    'financial_data': r'financial|revenue|earnings|profit|market\s+cap',
+    'company_info': r'headquarters|ceo|founded|employees|about',
+    'news': r'news|latest|recent|update|announce',
+    'technical': r'technology|software|product|service|api',
+}
+
+
+def load_query_categories(path: str = QUERY_CATEGORIES_FILE) -> Dict[str, str]:
+    """Categories from a JSON object of {name: pattern}, or the defaults when unset, unreadable or invalid."""
+    if not path:
+        return dict(DEFAULT_QUERY_CATEGORIES)
+    try:
+        with open(path, 'r') as f:
+            categories = json.load(f)
+        if not isinstance(categories, dict) or not all(isinstance(p, str) for p in categories.values()):
+            raise ValueError("expected a JSON object of {name: pattern} strings")
+        categories.pop(FALLBACK_CATEGORY, None)
+        for name, pattern in categories.items():
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                raise ValueError(f"bad pattern for '{name}': {str(e)}")
+        return categories
+    except (OSError, ValueError) as e:
+        logger.error(f"Error loading query categories from {path}, using built-in categories: {str(e)}")
+        return dict(DEFAULT_QUERY_CATEGORIES)
+
+
+class QueryClassifier:
+    """All category patterns compiled into one alternation, with results memoized per query.
+
+    A single scan of the query finds every category that matches, which
+    gives both the primary label (highest-priority match, as before) and
+    multi-label scores (each category's share of the matches).
+    """
+
+    def __init__(self, categories: Dict[str, str] = None, cache_size: int = 1024):
+        self.categories = categories if categories is not None else load_query_categories()
+        try:
+            self._compile()
+        except re.error as e:
+            # Patterns that compile alone can still clash once joined (inline flags, named groups)
+            logger.error(f"Could not compile query categories, using built-in categories: {str(e)}")
+            self.categories = dict(DEFAULT_QUERY_CATEGORIES)
+            self._compile()
+        self._match = lru_cache(maxsize=cache_size)(self._scan)
+
+    def _compile(self):
+        self.priority = {name: i for i, name in enumerate(self.categories)}
+        self._groups = {}
+        alternatives = []
+        for i, (name, pattern) in enumerate(self.categories.items()):
+            group = f"c{i}"
+            self._groups[group] = name
+            alternatives.append(f"(?P<{group}>{pattern})")
+        self._pattern = re.compile('|'.join(alternatives), re.IGNORECASE) if alternatives else None
+
+    def _scan(self, query: str) -> Tuple[Tuple[str, int], ...]:
+        """(category, hit count) pairs for the query, in priority order."""
+        if self._pattern is None:
+            return ()
+        hits = {}
+        for match in self._pattern.finditer(query):
+            name = self._groups[match.lastgroup]
+            hits[name] = hits.get(name, 0) + 1
+        return tuple(sorted(hits.items(), key=lambda item: self.priority[item[0]]))
+
+    def classify(self, query: str) -> str:
+        hits = self._match(query)
+        return hits[0][0] if hits else FALLBACK_CATEGORY
+
+    def scores(self, query: str) -> Dict[str, float]:
+        hits = self._match(query)
+        if not hits:
+            return {FALLBACK_CATEGORY: 1.0}
+        total = sum(count for _, count in hits)
+        return {name: count / total for name, count in hits}
+
+    def labels(self, query: str, min_score: float = 0.0) -> List[str]:
+        return [name for name, score in self.scores(query).items() if score >= min_score]
+
+    def cache_info(self):
+        return self._match.cache_info()
+
+
+query_classifier = QueryClassifier()
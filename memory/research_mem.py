@@ -1,89 +1,114 @@
-import os
-import json
-import re
+import atexit
+import threading
 from datetime import datetime, timezone
 from urllib.parse import urlparse
 from source_reliable.source_reliability_class import SourceReliability
+from memory.storage import create_storage
+from memory.feedback_stats import FeedbackIndex
+from memory.scoring import ReliabilityScorer
+from memory.query_classifier import query_classifier
+from config.settings import MEMORY_BACKEND, MEMORY_FLUSH_INTERVAL, MEMORY_FLUSH_BATCH
 from config.log import logger
 from typing import Dict, List
 
 
 class ResearchMemory:
-    def __init__(self, memory_file="agent_memory.json"):
+    def __init__(self, memory_file="agent_memory.json", backend: str = MEMORY_BACKEND):
         self.memory_file = memory_file
         self.source_reliability = {}
         self.query_patterns = {}
         self.feedback_history = {}
+        self.feedback_index = FeedbackIndex()
+        self.scorer = ReliabilityScorer()
+        self.storage = create_storage(backend, memory_file)
+        self._lock = threading.RLock()
+        self._dirty_sources = set()
+        self._pending_feedback = []
+        self._flush_timer = None
         self.load_memory()
+        atexit.register(self.save_memory)
     
     def load_memory(self):
         try:
-            if os.path.exists(self.memory_file):
-                with open(self.memory_file, 'r') as f:
-                    data = json.load(f)
-                    
-                    for domain, info in data.get('sources', {}).items():
-                        self.source_reliability[domain] = SourceReliability(
-                            domain=domain,
-                            query_types=info.get('query_types', {}),
-                            last_success=datetime.fromisoformat(info['last_success']) if info.get('last_success') else None,
-                            last_failure=datetime.fromisoformat(info['last_failure']) if info.get('last_failure') else None,
-                            total_attempts=info.get('total_attempts', 0),
-                            successful_attempts=info.get('successful_attempts', 0),
-                            average_response_time=info.get('average_response_time', 0.0),
-                            notes=info.get('notes', [])
-                        )
-                    
-                    self.query_patterns = data.get('query_patterns', {})
-                    self.feedback_history = data.get('feedback_history', {})
-                    
-                logger.info(f"Loaded research memory with {len(self.source_reliability)} sources and {len(self.feedback_history)} feedback entries")
+            data = self.storage.load()
+            
+            for domain, info in data.get('sources', {}).items():
+                self.source_reliability[domain] = SourceReliability(
+                    domain=domain,
+                    query_types=info.get('query_types', {}),
+                    last_success=datetime.fromisoformat(info['last_success']) if info.get('last_success') else None,
+                    last_failure=datetime.fromisoformat(info['last_failure']) if info.get('last_failure') else None,
+                    total_attempts=info.get('total_attempts', 0),
+                    successful_attempts=info.get('successful_attempts', 0),
+                    average_response_time=info.get('average_response_time', 0.0),
+                    notes=info.get('notes', [])
+                )
+            
+            self.scorer.load(self.source_reliability.values())
+            self.query_patterns = data.get('query_patterns', {})
+            self.feedback_history = data.get('feedback_history', {})
+            for entries in self.feedback_history.values():
+                for entry in entries:
+                    self.feedback_index.add(entry)
+                
+            logger.info(f"Loaded research memory with {len(self.source_reliability)} sources and {len(self.feedback_history)} feedback entries")
         except Exception as e:
             logger.error(f"Error loading research memory: {str(e)}")
             self.source_reliability = {}
             self.query_patterns = {}
             self.feedback_history = {}
+            self.feedback_index = FeedbackIndex()
+            self.scorer = ReliabilityScorer()
+
+    def _serialize_source(self, info: SourceReliability) -> Dict:
+        return {
+            'query_types': dict(info.query_types),
+            'last_success': info.last_success.isoformat() if info.last_success else None,
+            'last_failure': info.last_failure.isoformat() if info.last_failure else None,
+            'total_attempts': info.total_attempts,
+            'successful_attempts': info.successful_attempts,
+            'average_response_time': info.average_response_time,
+            'notes': list(info.notes)
+        }
+
+    def _mark_dirty(self, domain: str):
+        """Queue a changed source and debounce the write."""
+        with self._lock:
+            self.scorer.upsert(self.source_reliability[domain])
+            self._dirty_sources.add(domain)
+            if len(self._dirty_sources) >= MEMORY_FLUSH_BATCH:
+                self.save_memory()
+            elif self._flush_timer is None:
+                self._flush_timer = threading.Timer(MEMORY_FLUSH_INTERVAL, self.save_memory)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
     
     def save_memory(self):
-        try:
-            data = {
-                'sources': {
-                    domain: {
-                        'query_types': info.query_types,
-                        'last_success': info.last_success.isoformat() if info.last_success else None,
-                        'last_failure': info.last_failure.isoformat() if info.last_failure else None,
-                        'total_attempts': info.total_attempts,
-                        'successful_attempts': info.successful_attempts,
-                        'average_response_time': info.average_response_time,
-                        'notes': info.notes
-                    }
-                    for domain, info in self.source_reliability.items()
-                },
-                'query_patterns': self.query_patterns,
-                'feedback_history': self.feedback_history
+        """Write the sources and feedback entries changed since the last flush."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._dirty_sources and not self._pending_feedback:
+                return
+            sources = {
+                domain: self._serialize_source(self.source_reliability[domain])
+                for domain in self._dirty_sources if domain in self.source_reliability
             }
-            
-            with open(self.memory_file, 'w') as f:
-                json.dump(data, f, indent=2)
-                
-            logger.info("Successfully saved research memory")
-        except Exception as e:
-            logger.error(f"Error saving research memory: {str(e)}")
+            feedback = self._pending_feedback
+            try:
+                self.storage.write(sources, feedback, self.query_patterns)
+                self._dirty_sources = set()
+                self._pending_feedback = []
+                logger.info(f"Saved research memory ({len(sources)} sources, {len(feedback)} feedback entries)")
+            except Exception as e:
+                logger.error(f"Error saving research memory: {str(e)}")
     
     def categorize_query(self, query: str) -> str:
-        categories = {
-            'stock_price': r'(?i)(stock|share)\s+price|price\s+of\s+stock',
-            'financial_data': r'(?i)financial|revenue|earnings|profit|market\s+cap',
-            'company_info': r'(?i)headquarters|ceo|founded|employees|about',
-            'news': r'(?i)news|latest|recent|update|announce',
-            'technical': r'(?i)technology|software|product|service|api',
-            'general': r'.*'
-        }
-        
-        for category, pattern in categories.items():
-            if re.search(pattern, query):
-                return category
-        return 'general'
+        return query_classifier.classify(query)
+
+    def query_scores(self, query: str) -> Dict[str, float]:
+        return query_classifier.scores(query)
     
     def update_source_reliability(self, domain: str, query_type: str, success: bool, response_time: float, content_quality: float):
         if domain not in self.source_reliability:
@@ -121,46 +146,22 @@ class ResearchMemory:
             response_time * 0.1
         )
         
-        self.save_memory()
+        self._mark_dirty(domain)
     
     def get_best_sources(self, query_type: str, min_reliability: float = 0.3) -> List[str]:
-        relevant_sources = []
-        
-        for domain, source in self.source_reliability.items():
-            reliability = source.query_types.get(query_type, 0.0)
-            if reliability >= min_reliability:
-                relevant_sources.append((domain, reliability))
-        
-        relevant_sources.sort(key=lambda x: x[1], reverse=True)
-        return [domain for domain, _ in relevant_sources]
+        with self._lock:
+            return self.scorer.best_sources(query_type, min_reliability)
     
-    def prioritize_urls(self, urls: List[str], query: str) -> List[str]:
-        query_type = self.categorize_query(query)
-        self.get_best_sources(query_type)
-        
-        scored_urls = []
-        for url in urls:
-            domain = urlparse(url).netloc
-            source = self.source_reliability.get(domain)
-            
-            if source:
-                reliability = source.query_types.get(query_type, 0.0)
-                success_rate = source.successful_attempts / max(1, source.total_attempts)
-                response_speed = 1.0 / (1.0 + source.average_response_time)
-                score = (reliability * 0.5 +
-                        success_rate * 0.3 +
-                        response_speed * 0.2)
-            else:
-                score = 0.1
-            
-            scored_urls.append((url, score))
-        
-        scored_urls.sort(key=lambda x: x[1], reverse=True)
-        return [url for url, _ in scored_urls]
+    def prioritize_urls(self, urls: List[str], query: str, query_type: str = None) -> List[str]:
+        query_type = query_type or self.categorize_query(query)
+        domains = [urlparse(url).netloc for url in urls]
+        with self._lock:
+            order = self.scorer.rank(domains, query_type)
+        return [urls[i] for i in order]
     
-    def record_feedback(self, topic: str, sources: List[str], agent_assessment: Dict, human_feedback: bool, notes: str = None):
+    def record_feedback(self, topic: str, sources: List[str], agent_assessment: Dict, human_feedback: bool, notes: str = None, query_type: str = None):
         current_time = datetime.now(timezone.utc)
-        query_type = self.categorize_query(topic)
+        query_type = query_type or self.categorize_query(topic)
         
         feedback_entry = {
             'timestamp': current_time.isoformat(),
@@ -172,9 +173,12 @@ class ResearchMemory:
             'notes': notes
         }
         
-        if topic not in self.feedback_history:
-            self.feedback_history[topic] = []
-        self.feedback_history[topic].append(feedback_entry)
+        with self._lock:
+            if topic not in self.feedback_history:
+                self.feedback_history[topic] = []
+            self.feedback_history[topic].append(feedback_entry)
+            self.feedback_index.add(feedback_entry)
+            self._pending_feedback.append(feedback_entry)
         
         agent_confidence = agent_assessment.get('confidence', 0.0)
         agent_correct = agent_assessment.get('is_accurate', False)
@@ -195,7 +199,11 @@ class ResearchMemory:
                     source_info.notes.append(f"[{current_time.isoformat()}] Assessment contradicted by human feedback")
             else:
                 self._update_source_confidence(domain, query_type, agent_correct, agent_confidence)
+            with self._lock:
+                self.scorer.upsert(source_info)
+                self._dirty_sources.add(domain)
         
+        # Human feedback is rare and valuable: persist it right away
         self.save_memory()
         
     def _update_source_confidence(self, domain: str, query_type: str, success: bool, confidence: float):
@@ -214,58 +222,13 @@ class ResearchMemory:
         source.query_types[query_type] = max(0.0, min(1.0, new_reliability))
     
     def get_feedback_stats(self, domain: str = None, query_type: str = None) -> Dict:
-        stats = {
-            'total_entries': 0,
-            'agent_accuracy': 0.0,
-            'human_agreement': 0.0,
-            'query_type_performance': {},
-            'recent_trends': []
-        }
-        
-        relevant_entries = []
-        
-        for topic_entries in self.feedback_history.values():
-            for entry in topic_entries:
-                if domain and not any(domain in s for s in entry['sources']):
-                    continue
-                if query_type and entry['query_type'] != query_type:
-                    continue
-                relevant_entries.append(entry)
-        
-        if not relevant_entries:
-            return stats
-            
-        stats['total_entries'] = len(relevant_entries)
-        
-        correct_assessments = sum(1 for e in relevant_entries 
-                                if e['agent_assessment'].get('is_accurate') == e['human_feedback'])
-        human_agreements = sum(1 for e in relevant_entries if e['human_feedback'])
-        
-        stats['agent_accuracy'] = correct_assessments / len(relevant_entries)
-        stats['human_agreement'] = human_agreements / len(relevant_entries)
-        
-        query_types = {}
-        for entry in relevant_entries:
-            qt = entry['query_type']
-            if qt not in query_types:
-                query_types[qt] = {'total': 0, 'successful': 0}
-            query_types[qt]['total'] += 1
-            if entry['human_feedback']:
-                query_types[qt]['successful'] += 1
-        
-        stats['query_type_performance'] = {
-            qt: {'success_rate': data['successful'] / data['total']}
-            for qt, data in query_types.items()
-        }
-        
-        recent = relevant_entries[-10:]
-        stats['recent_trends'] = [
-            {
-                'timestamp': e['timestamp'],
-                'query_type': e['query_type'],
-                'success': e['human_feedback']
-            }
-            for e in recent
-        ]
-        
-        return stats
\ No newline at end of file
+        with self._lock:
+            return self.feedback_index.stats(domain, query_type)
+
+    def get_feedback_trend(self, domain: str = None, query_type: str = None, days: int = 7) -> List[Dict]:
+        with self._lock:
+            return self.feedback_index.daily(domain, query_type, days)
+
+    def get_domain_feedback(self, domain: str) -> List[Dict]:
+        with self._lock:
+            return self.feedback_index.entries_for_domain(domain)
@@ -0,0 +1,128 @@
+from source_reliable.source_reliability_class import SourceReliability
+from config.settings import SOURCE_DECAY_HALF_LIFE_DAYS
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+
+UNKNOWN_SOURCE_SCORE = 0.1
+RELIABILITY_WEIGHT = 0.5
+SUCCESS_RATE_WEIGHT = 0.3
+SPEED_WEIGHT = 0.2
+
+
+def _timestamp(value: Optional[datetime]) -> float:
+    if value is None:
+        return np.nan
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class ReliabilityScorer:
+    """Columnar copy of the source reliability table for batch scoring.
+
+    One row per domain: success rate, average latency, last success and
+    last failure timestamps, plus one reliability column per query type.
+    Reliability and success rate decay with the time since the last
+    success (half-life SOURCE_DECAY_HALF_LIFE_DAYS), and a failure newer
+    than the last success halves them again.
+    """
+
+    def __init__(self, half_life_days: float = SOURCE_DECAY_HALF_LIFE_DAYS, capacity: int = 1024):
+        self.half_life = half_life_days * 86400.0
+        self.index: Dict[str, int] = {}
+        self.domains: List[str] = []
+        self._capacity = capacity
+        self.success_rate = np.zeros(capacity, dtype=np.float32)
+        self.latency = np.zeros(capacity, dtype=np.float32)
+        self.last_success = np.full(capacity, np.nan)
+        self.last_failure = np.full(capacity, np.nan)
+        self.reliability: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.domains)
+
+    def _grow(self, needed: int):
+        capacity = self._capacity
+        while capacity < needed:
+            capacity *= 2
+        if capacity == self._capacity:
+            return
+        pad = capacity - self._capacity
+        self.success_rate = np.concatenate([self.success_rate, np.zeros(pad, dtype=np.float32)])
+        self.latency = np.concatenate([self.latency, np.zeros(pad, dtype=np.float32)])
+        self.last_success = np.concatenate([self.last_success, np.full(pad, np.nan)])
+        self.last_failure = np.concatenate([self.last_failure, np.full(pad, np.nan)])
+        for query_type, column in self.reliability.items():
+            self.reliability[query_type] = np.concatenate([column, np.zeros(pad, dtype=np.float32)])
+        self._capacity = capacity
+
+    def _column(self, query_type: str) -> np.ndarray:
+        column = self.reliability.get(query_type)
+        if column is None:
+            column = self.reliability[query_type] = np.zeros(self._capacity, dtype=np.float32)
+        return column
+
+    def upsert(self, source: SourceReliability):
+        row = self.index.get(source.domain)
+        if row is None:
+            row = len(self.domains)
+            self._grow(row + 1)
+            self.index[source.domain] = row
+            self.domains.append(source.domain)
+        self.success_rate[row] = source.successful_attempts / max(1, source.total_attempts)
+        self.latency[row] = source.average_response_time
+        self.last_success[row] = _timestamp(source.last_success)
+        self.last_failure[row] = _timestamp(source.last_failure)
+        for query_type, reliability in source.query_types.items():
+            self._column(query_type)[row] = reliability
+
+    def load(self, sources: Iterable[SourceReliability]):
+        for source in sources:
+            self.upsert(source)
+
+    def rows(self, domains: List[str]) -> np.ndarray:
+        index = self.index
+        return np.fromiter((index.get(domain, -1) for domain in domains), dtype=np.int64, count=len(domains))
+
+    def _score_rows(self, rows: np.ndarray, query_type: str, now: float) -> np.ndarray:
+        column = self.reliability.get(query_type)
+        reliability = column[rows] if column is not None else np.zeros(len(rows), dtype=np.float32)
+
+        last_success = self.last_success[rows]
+        last_failure = self.last_failure[rows]
+        freshness = np.where(np.isnan(last_success), 0.0,
+                             np.exp2(-np.maximum(now - np.nan_to_num(last_success), 0.0) / self.half_life))
+        failed_since = ~np.isnan(last_failure) & (np.isnan(last_success) | (last_failure > np.nan_to_num(last_success)))
+        freshness = np.where(failed_since, freshness * 0.5, freshness)
+
+        speed = 1.0 / (1.0 + self.latency[rows])
+        return ((reliability * RELIABILITY_WEIGHT + self.success_rate[rows] * SUCCESS_RATE_WEIGHT) * freshness +
+                speed * SPEED_WEIGHT)
+
+    def score(self, domains: List[str], query_type: str, now: float = None) -> np.ndarray:
+        """Score a batch of domains in one pass; unknown domains get UNKNOWN_SOURCE_SCORE."""
+        now = datetime.now(timezone.utc).timestamp() if now is None else now
+        rows = self.rows(domains)
+        known = rows >= 0
+        scores = np.full(len(domains), UNKNOWN_SOURCE_SCORE)
+        if known.any():
+            scores[known] = self._score_rows(rows[known], query_type, now)
+        return scores
+
+    def rank(self, domains: List[str], query_type: str, k: int = None, now: float = None) -> np.ndarray:
+        """Positions of the k best domains, best first (all of them when k is None)."""
+        scores = self.score(domains, query_type, now)
+        if k is not None and k < len(scores):
+            top = np.argpartition(-scores, k)[:k]
+            return top[np.argsort(-scores[top], kind='stable')]
+        return np.argsort(-scores, kind='stable')
+
+    def best_sources(self, query_type: str, min_reliability: float = 0.3) -> List[str]:
+        column = self.reliability.get(query_type)
+        if column is None:
+            return []
+        values = column[:len(self.domains)]
+        rows = np.flatnonzero(values >= min_reliability)
+        rows = rows[np.argsort(-values[rows], kind='stable')]
+        return [self.domains[row] for row in rows]
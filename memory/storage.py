@@ -0,0 +1,102 @@
+from config.log import logger
+from typing import Dict, List, Optional
+import sqlite3
+import json
+import os
+
+
+class JsonStorage:
+    """The original single-file format, written atomically (temp file + rename)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._data = {'sources': {}, 'query_patterns': {}, 'feedback_history': {}}
+
+    def load(self) -> Dict:
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            self._data = {
+                'sources': data.get('sources', {}),
+                'query_patterns': data.get('query_patterns', {}),
+                'feedback_history': data.get('feedback_history', {})
+            }
+        return self._data
+
+    def write(self, sources: Dict[str, Dict], feedback: List[Dict], query_patterns: Optional[Dict] = None):
+        self._data['sources'].update(sources)
+        for entry in feedback:
+            self._data['feedback_history'].setdefault(entry['topic'], []).append(entry)
+        if query_patterns is not None:
+            self._data['query_patterns'] = query_patterns
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._data, f)
+        os.replace(tmp_path, self.path)
+
+
+class SqliteStorage:
+    """One row per source and per feedback entry; a flush writes only what changed."""
+
+    def __init__(self, path: str, legacy_json_path: str = None):
+        self.path = path
+        self.legacy_json_path = legacy_json_path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS sources (domain TEXT PRIMARY KEY, data TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS feedback (id INTEGER PRIMARY KEY AUTOINCREMENT, topic TEXT NOT NULL, data TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        """)
+
+    def _is_empty(self) -> bool:
+        return (self._conn.execute("SELECT COUNT(*) FROM sources").fetchone()[0] == 0 and
+                self._conn.execute("SELECT COUNT(*) FROM feedback").fetchone()[0] == 0)
+
+    def _migrate_legacy_json(self):
+        legacy = JsonStorage(self.legacy_json_path).load()
+        feedback = [entry for entries in legacy['feedback_history'].values() for entry in entries]
+        self.write(legacy['sources'], feedback, legacy['query_patterns'])
+        os.replace(self.legacy_json_path, f"{self.legacy_json_path}.migrated")
+        logger.info(f"Migrated {len(legacy['sources'])} sources and {len(feedback)} feedback entries "
+                    f"from {self.legacy_json_path} to {self.path}")
+
+    def load(self) -> Dict:
+        if self.legacy_json_path and os.path.exists(self.legacy_json_path) and self._is_empty():
+            self._migrate_legacy_json()
+
+        sources = {domain: json.loads(data) for domain, data in self._conn.execute("SELECT domain, data FROM sources")}
+        feedback_history = {}
+        for topic, data in self._conn.execute("SELECT topic, data FROM feedback ORDER BY id"):
+            feedback_history.setdefault(topic, []).append(json.loads(data))
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'query_patterns'").fetchone()
+        return {
+            'sources': sources,
+            'query_patterns': json.loads(row[0]) if row else {},
+            'feedback_history': feedback_history
+        }
+
+    def write(self, sources: Dict[str, Dict], feedback: List[Dict], query_patterns: Optional[Dict] = None):
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO sources (domain, data) VALUES (?, ?)",
+                [(domain, json.dumps(data)) for domain, data in sources.items()]
+            )
+            self._conn.executemany(
+                "INSERT INTO feedback (topic, data) VALUES (?, ?)",
+                [(entry['topic'], json.dumps(entry)) for entry in feedback]
+            )
+            if query_patterns is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('query_patterns', ?)",
+                    (json.dumps(query_patterns),)
+                )
+
+
+def create_storage(backend: str, memory_file: str):
+    """Build the configured backend; SQLite picks up an existing JSON memory file on first use."""
+    if backend == 'json':
+        return JsonStorage(memory_file)
+    sqlite_path = f"{os.path.splitext(memory_file)[0]}.sqlite"
+    return SqliteStorage(sqlite_path, legacy_json_path=memory_file)
\ No newline at end of file
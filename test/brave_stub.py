@@ -0,0 +1,139 @@
+from config.log import logger
+from tools.brave_search import BraveClient, rank_by_snippet
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import asyncio
+import time
+import httpx
+import json
+
+# Canned Brave-shaped results; the first is deliberately the least on-topic
+STUB_RESULTS = [
+    {'title': 'Company homepage', 'url': 'https://example.com/', 'description': 'Welcome to our site', 'age': '2 days ago'},
+    {'title': 'ACME stock price today', 'url': 'https://finance.example.org/quote/ACME',
+     'description': 'ACME stock price, market cap and trading volume', 'age': '1 hour ago'},
+    {'title': 'ACME earnings report', 'url': 'https://news.example.net/acme-earnings',
+     'description': 'ACME quarterly earnings beat estimates; stock price rises', 'page_age': '2026-01-01T00:00:00'},
+]
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    hits = {}
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query).get('q', [''])[0]
+        hits = self.hits[query] = self.hits.get(query, 0) + 1
+        if query == 'rate-limited' or (query == 'rate-limited-once' and hits == 1):
+            self.send_response(429)
+            self.send_header('Retry-After', '0.2')
+            self.end_headers()
+            return
+        if query == 'quota-exhausted':
+            self.send_response(429)
+            self.send_header('X-RateLimit-Remaining', '1, 0')
+            self.send_header('X-RateLimit-Reset', '1, 1419704')
+            self.end_headers()
+            return
+        count = int(parse_qs(urlparse(self.path).query).get('count', ['6'])[0])
+        body = json.dumps({'query': {'original': query}, 'web': {'results': STUB_RESULTS[:count]}}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class BraveStubServer:
+    """Local stand-in for the Brave web search endpoint, for testing without network or API key."""
+
+    def __enter__(self) -> 'BraveStubServer':
+        _StubHandler.hits = {}
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _StubHandler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/res/v1/web/search"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+async def _check_cancelled_owner(client: BraveClient):
+    """Waiters coalesced onto a request whose owner is cancelled get an error, not a hang."""
+    async with httpx.AsyncClient() as http:
+        # Drain the bucket so the owning request is still queued when it is cancelled
+        while client.limiter.reserve() == 0:
+            pass
+        owner = asyncio.create_task(client.asearch(http, "cancelled owner"))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(client.asearch(http, "cancelled owner"))
+        await asyncio.sleep(0.01)
+        owner.cancel()
+        try:
+            await asyncio.wait_for(waiter, 2)
+            raise AssertionError("expected the coalesced waiter to fail")
+        except RuntimeError as e:
+            assert 'cancelled' in str(e)
+
+
+def test_brave_client() -> bool:
+    """Check the structured search client against the local stub."""
+    client = None
+    try:
+        with BraveStubServer() as stub:
+            client = BraveClient(base_url=stub.url, qps=5, burst=1)
+            results = client.search("ACME stock price")
+            assert [r.rank for r in results] == [1, 2, 3]
+            assert results[1].url == 'https://finance.example.org/quote/ACME'
+            assert results[0].age == '2 days ago' and results[2].age == '2026-01-01T00:00:00'
+
+            ranked = rank_by_snippet(results, "ACME stock price")
+            assert ranked[0].rank == 2, "snippet pre-ranking should promote the quote page"
+
+            # Repeats come from the cache, concurrent duplicates share one request
+            client.search("  acme STOCK price ")
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                list(executor.map(client.search, ["ACME news"] * 4))
+            assert _StubHandler.hits["ACME stock price"] == 1 and _StubHandler.hits["ACME news"] == 1
+
+            start = time.time()
+            assert client.search("rate-limited-once")
+            assert time.time() - start >= 0.2, "Retry-After should be honored"
+
+            try:
+                client.search("rate-limited", retries=2)
+                raise AssertionError("expected HTTP 429")
+            except httpx.HTTPStatusError as e:
+                assert e.response.status_code == 429
+            # A spent monthly quota fails at once instead of pausing until the month resets
+            start = time.time()
+            try:
+                client.search("quota-exhausted")
+                raise AssertionError("expected HTTP 429")
+            except httpx.HTTPStatusError as e:
+                assert e.response.status_code == 429 and time.time() - start < 1.0
+            assert client.limiter.reserve() < 1.0, "monthly exhaustion must not pause the limiter"
+
+            asyncio.run(_check_cancelled_owner(client))
+
+            stats = client.stats()
+            assert stats['cache_hits'] >= 1 and stats['rate_limited'] >= 2
+            logger.info(f"Brave client stats: {stats}")
+        logger.info("✅ Brave search client works against the stub")
+        return True
+    except Exception as e:
+        logger.error(f"❌ Brave search client test failed: {str(e)}")
+        return False
+    finally:
+        if client:
+            client.close()
+
+
+if __name__ == "__main__":
+    test_brave_client()
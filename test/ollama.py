@@ -1,17 +1,13 @@
 from config.log import logger
-from langchain_ollama import ChatOllama
 from langchain.schema import HumanMessage, AIMessage
+from configure.config_llm import configure_llm
+from Model.provider import ModelProvider
 
 def test_ollama() -> bool:
     """Test if Ollama is running and accessible."""
     try:
-        test_llm = ChatOllama(
-            model="llama3.2:3b-instruct-q8_0",
-            base_url="http://localhost:11434",
-            temperature=0,
-            num_gpu=1,
-            num_thread=8
-        )
+        # Check the shared client the agent will use, so its connection is already warm
+        test_llm = configure_llm(ModelProvider.OLLAMA)
         resp = test_llm([HumanMessage(content="Hello")])
         if isinstance(resp, AIMessage) and len(resp.content) > 0:
             logger.info("✅ Ollama is accessible")
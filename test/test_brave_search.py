@@ -0,0 +1,6 @@
+from test.brave_stub import test_brave_client as check_brave_client
+
+
+def test_brave_client_against_stub():
+    """Collects test/brave_stub.py's check under pytest, which skips modules not named test_*."""
+    assert check_brave_client()
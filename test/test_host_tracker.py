@@ -0,0 +1,92 @@
+from config.log import logger
+from tools.host_tracker import (HostTracker, classify_failure, BOT_WALL, TIMEOUT, RENDER_ERROR,
+                                CLOSED, OPEN, HALF_OPEN)
+import tempfile
+import time
+import os
+
+URL = 'https://news.example.com/story'
+
+
+def _tracker(directory: str) -> HostTracker:
+    return HostTracker(path=os.path.join(directory, 'host_health.json'),
+                       legacy_filename=os.path.join(directory, 'HOSTS.txt'))
+
+
+def _expire_window(tracker: HostTracker, url: str):
+    tracker.hosts[tracker._host(url)].open_until = time.time() - 1
+
+
+def test_circuit_opens_probes_and_closes():
+    with tempfile.TemporaryDirectory() as directory:
+        tracker = _tracker(directory)
+        assert tracker.admit(URL).admit
+
+        # One timeout is a strike, the threshold's worth opens the circuit
+        tracker.record_failure(URL, TimeoutError("page load timed out"))
+        assert tracker.admit(URL).state == CLOSED
+        tracker.record_failure(URL, TimeoutError("page load timed out"))
+        decision = tracker.admit(URL)
+        assert not decision.admit and decision.state == OPEN
+
+        # After the window one probe goes through, a second caller waits for it;
+        # looking with probe=False does not use the slot up
+        _expire_window(tracker, URL)
+        assert tracker.admit(URL, probe=False).admit
+        probe = tracker.admit(URL)
+        assert probe.admit and probe.state == HALF_OPEN
+        assert not tracker.admit(URL).admit
+
+        tracker.record_success(URL, 1.5)
+        decision = tracker.admit(URL)
+        assert decision.admit and decision.state == CLOSED
+        tracker.path = ''
+
+
+def test_failed_probe_reopens_with_longer_window():
+    with tempfile.TemporaryDirectory() as directory:
+        tracker = _tracker(directory)
+        tracker.record_failure('https://www.example.org/a', BOT_WALL)
+        # Mirror hosts share one record, and a bot wall trips at once
+        health = tracker.hosts['example.org']
+        assert health.state == OPEN
+        first_window = health.open_until - time.time()
+
+        _expire_window(tracker, 'https://m.example.org/b')
+        assert tracker.admit('https://m.example.org/b').state == HALF_OPEN
+        tracker.record_failure('https://example.org/c', BOT_WALL)
+        assert health.state == OPEN and health.open_until - time.time() > first_window * 1.5
+        tracker.path = ''
+
+
+def test_release_probe_and_snapshot():
+    with tempfile.TemporaryDirectory() as directory:
+        tracker = _tracker(directory)
+        tracker.record_failure(URL, BOT_WALL)
+        _expire_window(tracker, URL)
+        assert tracker.admit(URL).state == HALF_OPEN
+        tracker.release_probe(URL)
+        assert tracker.admit(URL).admit, "a released probe slot should be claimable again"
+
+        tracker.snapshot()
+        restored = _tracker(directory)
+        # An interrupted probe is restored as open, not as a probe that never finishes
+        assert restored.hosts['news.example.com'].state == OPEN
+        assert restored.hosts['news.example.com'].failure_kinds == {BOT_WALL: 1}
+        tracker.path = restored.path = ''
+
+
+def test_classify_failure():
+    assert classify_failure(TimeoutError("boom")) == TIMEOUT
+    assert classify_failure(Exception("Message: timeout: Timed out receiving message")) == TIMEOUT
+    # Bot walls come from the page title, never from error text
+    assert classify_failure(Exception("Groq returned 429 Too Many Requests")) != BOT_WALL
+    assert classify_failure(Exception("Just a moment... chrome crashed")) == RENDER_ERROR
+
+
+if __name__ == "__main__":
+    test_circuit_opens_probes_and_closes()
+    test_failed_probe_reopens_with_longer_window()
+    test_release_probe_and_snapshot()
+    test_classify_failure()
+    logger.info("✅ Host tracker circuit breaker works")
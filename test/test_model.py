@@ -1,7 +1,7 @@
 from config.log import logger
 from Model.provider import ModelProvider
 from config.settings import GROQ_API_KEY
-import requests
+from configure.registry import model_registry
 from test.ollama import test_ollama
 
 def test_model_provider(provider: str) -> bool:
@@ -14,7 +14,8 @@ def test_model_provider(provider: str) -> bool:
                 logger.error("GROQ_API_KEY not set.")
                 return False
             headers = {"Authorization": f"Bearer {GROQ_API_KEY}"}
-            response = requests.get("https://api.groq.com/openai/v1/models", headers=headers)
+            # Reuse the keep-alive connection pool shared with the Groq chat clients
+            response = model_registry.http_client(provider).get("https://api.groq.com/openai/v1/models", headers=headers)
             response.raise_for_status()
             logger.info("✅ Groq API is accessible")
             return True
@@ -0,0 +1,56 @@
+from config.log import logger
+from tools.page_cache import PageCache, cache_key
+import tempfile
+import time
+import os
+
+URL = 'https://example.com/quote/ACME'
+TOPIC = 'ACME stock price'
+
+
+def _cache(directory: str, **kwargs) -> PageCache:
+    return PageCache(path=os.path.join(directory, 'pages.sqlite'), **kwargs)
+
+
+def test_entries_expire_at_their_ttl():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = _cache(directory, ttls={'stock_price': 0.2, 'general': 60})
+        quote = cache_key(URL, 'stock_price', TOPIC)
+        about = cache_key(URL, 'general', TOPIC)
+        cache.put(quote, URL, 'q', 'ACME $10', 'stock_price', {'path': 'http', 'fetch_time': 2.0})
+        cache.put(about, URL, 'q', 'ACME makes anvils', 'general', {'path': 'vision', 'fetch_time': 9.0})
+        assert cache.get(quote) == 'ACME $10'
+
+        time.sleep(0.3)
+        assert cache.get(quote) is None, "stock prices should expire at their TTL"
+        assert cache.get(about) == 'ACME makes anvils'
+        stats = cache.stats()
+        assert stats['expired'] == 1 and stats['hits'] == 2 and stats['fetch_time_saved'] == 11.0
+
+
+def test_keys():
+    # Tracking parameters and mirror hosts hit the same entry; topic and query type do not
+    key = cache_key(URL, 'stock_price', TOPIC)
+    assert cache_key('https://www.example.com/quote/ACME?utm_source=x', 'stock_price', '  acme STOCK price') == key
+    assert cache_key(URL, 'stock_price', 'ACME earnings') != key
+    assert cache_key(URL, 'news', TOPIC) != key
+
+
+def test_size_cap_evicts_least_recently_used():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = _cache(directory, max_mb=0.001, ttls={'general': 60})
+        keys = [cache_key(f"{URL}/{i}", 'general', TOPIC) for i in range(3)]
+        for i, key in enumerate(keys[:2]):
+            cache.put(key, f"{URL}/{i}", 'q', 'x' * 400, 'general', {})
+        cache.get(keys[0])
+        cache.put(keys[2], f"{URL}/2", 'q', 'x' * 400, 'general', {})
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) is not None and cache.get(keys[2]) is not None
+        assert cache.stats()['evictions'] == 1
+
+
+if __name__ == "__main__":
+    test_entries_expire_at_their_ttl()
+    test_keys()
+    test_size_cap_evicts_least_recently_used()
+    logger.info("✅ Page cache works")
@@ -0,0 +1,79 @@
+from config.log import logger
+from memory.query_classifier import QueryClassifier, load_query_categories, DEFAULT_QUERY_CATEGORIES
+import tempfile
+import json
+import re
+import os
+
+# ResearchMemory.categorize_query as it was before the combined classifier
+LEGACY_CATEGORIES = {
+    'stock_price': r'(?i)(stock|share)\s+price|price\s+of\s+stock',
+    'financial_data': r'(?i)financial|revenue|earnings|profit|market\s+cap',
+    'company_info': r'(?i)headquarters|ceo|founded|employees|about',
+    'news': r'(?i)news|latest|recent|update|announce',
+    'technical': r'(?i)technology|software|product|service|api',
+    'general': r'.*'
+}
+
+QUERIES = [
+    "What is the current stock price of Apple?",
+    "NVDA SHARE PRICE today",
+    "Tesla quarterly revenue and earnings",
+    "Who is the CEO of Microsoft and where is its headquarters?",
+    "latest news about OpenAI",
+    "What software products does Adobe sell?",
+    "How tall is Mount Everest?",
+    "price of stock for Amazon after earnings news",
+    "",
+]
+
+
+def legacy_categorize_query(query: str) -> str:
+    for category, pattern in LEGACY_CATEGORIES.items():
+        if re.search(pattern, query):
+            return category
+    return 'general'
+
+
+def test_matches_legacy_labels():
+    classifier = QueryClassifier(dict(DEFAULT_QUERY_CATEGORIES))
+    for query in QUERIES:
+        assert classifier.classify(query) == legacy_categorize_query(query), query
+
+
+def test_scores_and_memoization():
+    classifier = QueryClassifier(dict(DEFAULT_QUERY_CATEGORIES))
+    scores = classifier.scores("price of stock for Amazon after earnings news")
+    assert set(scores) == {'stock_price', 'financial_data', 'news'}
+    assert abs(sum(scores.values()) - 1.0) < 1e-9
+    assert classifier.scores("How tall is Mount Everest?") == {'general': 1.0}
+
+    classifier.classify("latest news about OpenAI")
+    classifier.classify("latest news about OpenAI")
+    assert classifier.cache_info().hits >= 1
+
+
+def test_bad_category_files_fall_back():
+    with tempfile.TemporaryDirectory() as directory:
+        cases = {
+            'broken.json': '{"stocks": ',
+            'not_object.json': '["stock"]',
+            'bad_regex.json': json.dumps({'stocks': 'stock(', 'news': 'news'}),
+        }
+        for name, body in cases.items():
+            path = os.path.join(directory, name)
+            with open(path, 'w') as f:
+                f.write(body)
+            assert load_query_categories(path) == DEFAULT_QUERY_CATEGORIES, name
+
+    # Patterns that compile alone but clash once joined into one alternation
+    classifier = QueryClassifier({'a': r'(?P<n>stock)', 'b': r'(?P<n>news)'})
+    assert classifier.categories == DEFAULT_QUERY_CATEGORIES
+    assert classifier.classify("NVDA share price") == 'stock_price'
+
+
+if __name__ == "__main__":
+    test_matches_legacy_labels()
+    test_scores_and_memoization()
+    test_bad_category_files_fall_back()
+    logger.info("✅ Query classifier works")
@@ -0,0 +1,49 @@
+from config.log import logger
+from agent.topic_store import TopicStore
+import tempfile
+import os
+
+FIELDS = {'relevance': 0.9, 'confidence': 0.8, 'main_facts': ['ACME trades at $10', 'acme  TRADES at $10']}
+
+
+def test_evicts_least_recently_used_topic_and_its_files():
+    with tempfile.TemporaryDirectory() as directory:
+        evicted = []
+        store = TopicStore(max_topics=2, max_mb=64, spill_dir=directory, on_evict=evicted.append)
+        store.start('alpha')
+        alpha = store.add_source('alpha', 'https://a.example/1', 'alpha page text', FIELDS)
+        store.start('beta')
+        beta = store.add_source('beta', 'https://b.example/1', 'beta page text', FIELDS)
+        assert os.path.exists(alpha.content_path) and os.path.exists(beta.content_path)
+        assert beta.content == 'beta page text' and beta['relevance'] == 0.9
+
+        # Touching alpha makes beta the least recently used
+        store['alpha']
+        store.start('gamma')
+        assert 'alpha' in store and 'gamma' in store and 'beta' not in store
+        assert evicted == ['beta']
+        assert not os.path.exists(beta.content_path), "evicted topics should delete their spill files"
+        assert os.path.exists(alpha.content_path)
+        assert store.footprint()['evictions'] == 1
+
+
+def test_byte_bound_keeps_current_topic_and_dedupes_facts():
+    with tempfile.TemporaryDirectory() as directory:
+        # Roughly 1 KB: any two topics with a source exceed it
+        store = TopicStore(max_topics=10, max_mb=0.001, spill_dir=directory)
+        store.start('old')
+        store.add_source('old', 'https://a.example/1', 'x' * 100, {'found_data': 'y' * 600})
+        store.start('current')
+        store.add_source('current', 'https://b.example/1', 'x' * 100, {'found_data': 'y' * 2000})
+        assert 'old' not in store and 'current' in store, "the topic being researched is never evicted"
+
+        research = store['current']
+        store.add_source('current', 'https://b.example/2', '', FIELDS)
+        assert research.main_facts == ['ACME trades at $10']
+        assert store.footprint()['duplicate_facts'] == 1
+
+
+if __name__ == "__main__":
+    test_evicts_least_recently_used_topic_and_its_files()
+    test_byte_bound_keeps_current_topic_and_dedupes_facts()
+    logger.info("✅ Topic store works")
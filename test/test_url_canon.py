@@ -0,0 +1,49 @@
+from config.log import logger
+from tools.url_canon import canonical_host, canonicalize_url, find_canonical_link, UrlCanonicalizer
+
+ARTICLE = 'https://example.com/news/story'
+
+
+def test_tracking_params_and_fragments():
+    assert canonicalize_url('https://example.com/news/story?utm_source=x&utm_medium=y#comments') == ARTICLE
+    assert canonicalize_url('https://example.com/news/story?gclid=1&fbclid=2&_ga=3') == ARTICLE
+    # Content-selecting parameters survive, in a stable order
+    assert canonicalize_url('https://example.com/q?s=AAPL&ref=nav&utm_campaign=z') == 'https://example.com/q?ref=nav&s=AAPL'
+    assert canonicalize_url('https://example.com/q?b=2&a=1') == canonicalize_url('https://example.com/q?a=1&b=2')
+
+
+def test_hosts_scheme_and_paths():
+    for variant in ('http://www.example.com/news/story/', 'https://m.example.com/news/story',
+                    'https://EXAMPLE.com:443/news//story', 'https://amp.example.com/news/story'):
+        assert canonicalize_url(variant) == ARTICLE, variant
+    assert canonical_host('https://www.example.com:8080/') == 'example.com:8080'
+    # A bare two-label domain keeps its name even when it looks like a prefix
+    assert canonical_host('https://m.com/') == 'm.com'
+
+
+def test_amp_paths():
+    assert canonicalize_url('https://example.com/news/story/amp') == ARTICLE
+    assert canonicalize_url('https://example.com/amp/news/story') == ARTICLE
+    assert canonicalize_url('https://example.com/news/story.amp.html') == 'https://example.com/news/story.html'
+    assert canonicalize_url('https://example.com/news/amplifier') == 'https://example.com/news/amplifier'
+
+
+def test_canonical_links():
+    html = '<html><head><link rel="canonical" href="/news/story"></head></html>'
+    assert find_canonical_link(html, 'https://example.com/news/story-123') == 'https://example.com/news/story'
+    assert find_canonical_link('<html></html>', ARTICLE) is None
+
+    canonicalizer = UrlCanonicalizer()
+    alias = 'https://example.com/news/story-123?utm_source=feed'
+    assert canonicalizer.key(alias) != canonicalizer.key(ARTICLE)
+    canonicalizer.record_canonical(alias, ARTICLE)
+    assert canonicalizer.key('https://www.example.com/news/story-123') == canonicalizer.key(ARTICLE)
+    assert canonicalizer.stats()['canonical_links'] == 1
+
+
+if __name__ == "__main__":
+    test_tracking_params_and_fragments()
+    test_hosts_scheme_and_paths()
+    test_amp_paths()
+    test_canonical_links()
+    logger.info("✅ URL canonicalizer works")
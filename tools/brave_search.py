@@ -0,0 +1,334 @@
+from config.log import logger
+from config.settings import (BRAVE_API_KEY, BRAVE_SEARCH_URL, BRAVE_QPS, BRAVE_BURST, BRAVE_MAX_RETRY_DELAY,
+                             SEARCH_CACHE_TTL, SEARCH_CACHE_SIZE)
+from tools.text_extract import topic_keywords
+from concurrent.futures import Future
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Tuple
+import threading
+import asyncio
+import random
+import httpx
+import time
+
+
+@dataclass
+class SearchResult:
+    """One Brave web result, in the order Brave ranked it (rank starts at 1)."""
+    rank: int
+    url: str
+    title: str
+    snippet: str
+    age: Optional[str] = None
+    query: str = ''
+    score: float = 0.0
+
+
+def parse_results(payload: Dict, query: str = '') -> List[SearchResult]:
+    results = payload.get('web', {}).get('results', [])
+    return [
+        SearchResult(
+            rank=i,
+            url=r.get('url', ''),
+            title=r.get('title', ''),
+            snippet=r.get('description', ''),
+            age=r.get('age') or r.get('page_age'),
+            query=query
+        )
+        for i, r in enumerate(results, start=1) if r.get('url')
+    ]
+
+
+def rank_by_snippet(results: List[SearchResult], topic: str) -> List[SearchResult]:
+    """Order results by topic keyword coverage of title and snippet, with Brave's rank as the prior.
+
+    Costs nothing beyond the search itself, so weak results can be dropped
+    before any page is fetched.
+    """
+    keywords = topic_keywords(topic)
+    for result in results:
+        text = f"{result.title} {result.snippet}".lower()
+        coverage = sum(1 for k in keywords if k in text) / len(keywords) if keywords else 0.0
+        result.score = coverage * 0.7 + 0.3 / result.rank
+    return sorted(results, key=lambda r: r.score, reverse=True)
+
+
+def _request(query: str, count: int) -> Dict:
+    return {
+        'params': {'q': query, 'count': count},
+        'headers': {'X-Subscription-Token': BRAVE_API_KEY or '', 'Accept': 'application/json'}
+    }
+
+
+def _retry_delay(response: httpx.Response, attempt: int) -> Optional[float]:
+    """Seconds to wait before retrying, capped at BRAVE_MAX_RETRY_DELAY; None when the monthly quota is spent."""
+    # Brave sends "per-second, per-month" pairs, e.g. X-RateLimit-Reset: 1, 1419704
+    remaining = response.headers.get('X-RateLimit-Remaining', '').split(',')
+    reset = response.headers.get('X-RateLimit-Reset', '').split(',')
+    try:
+        if len(remaining) > 1 and int(remaining[1]) <= 0:
+            return None
+    except ValueError:
+        pass
+
+    delay = float(2 ** attempt)
+    retry_after = response.headers.get('Retry-After')
+    try:
+        if retry_after:
+            delay = max(0.0, float(retry_after))
+        elif int(remaining[0]) <= 0:
+            delay = max(0.0, float(reset[0]))
+    except ValueError:
+        pass
+    return min(delay, BRAVE_MAX_RETRY_DELAY)
+
+
+class TokenBucket:
+    """Queues callers so requests leave at no more than rate per second (burst at once).
+
+    Each caller reserves a token, possibly going into debt, and sleeps until
+    the debt is paid, so waiters are served in arrival order. A pause moves
+    the refill clock past its end, so callers queued behind it leave one
+    interval apart afterwards rather than all at once.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.stats = {'acquired': 0, 'waited': 0, 'wait_total': 0.0, 'wait_max': 0.0}
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            # While paused, updated is in the future and the refill is negative: the pause is debt
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            self.stats['acquired'] += 1
+            if wait > 0:
+                self.stats['waited'] += 1
+                self.stats['wait_total'] += wait
+                self.stats['wait_max'] = max(self.stats['wait_max'], wait)
+            return wait
+
+    def acquire(self) -> float:
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def aacquire(self) -> float:
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float):
+        """Hold every caller back for seconds, e.g. after a 429; no burst is allowed when it ends."""
+        with self._lock:
+            now = time.monotonic()
+            if now > self.updated:
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.tokens = min(self.tokens, 1.0)
+            self.updated = max(self.updated, now + seconds)
+
+
+class SearchCache:
+    """LRU of search results with a TTL, keyed on the normalized query and parameters."""
+
+    def __init__(self, ttl: float = SEARCH_CACHE_TTL, max_entries: int = SEARCH_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(query: str, count: int) -> Tuple[str, int]:
+        return ' '.join(query.lower().split()), count
+
+    def get(self, key) -> Optional[List[SearchResult]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, results = entry
+            if expires < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return [replace(r) for r in results]
+
+    def put(self, key, results: List[SearchResult]):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, [replace(r) for r in results])
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class BraveClient:
+    """Brave web search over one pooled keep-alive HTTP client.
+
+    Requests go through a TTL cache, then join an identical request already
+    in flight, then wait on a token bucket sized to the plan's QPS. 429s and
+    5xx responses are retried after the delay the API asks for.
+    """
+
+    def __init__(self, base_url: str = BRAVE_SEARCH_URL, count: int = 6, timeout: float = 20.0,
+                 qps: float = BRAVE_QPS, burst: int = BRAVE_BURST, cache: SearchCache = None):
+        self.base_url = base_url
+        self.count = count
+        self.client = httpx.Client(
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(max_connections=8, max_keepalive_connections=4)
+        )
+        self.limiter = TokenBucket(qps, burst)
+        self.cache = cache or SearchCache()
+        self._inflight: Dict[Tuple[str, int], Future] = {}
+        self._ainflight: Dict[Tuple[str, int], asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'cache_hits': 0, 'coalesced': 0, 'rate_limited': 0,
+                       'retries': 0, 'retry_wait_total': 0.0}
+
+    def _count(self, name: str, amount: float = 1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def _retryable(self, error: Exception, attempt: int, retries: int) -> Optional[float]:
+        """Delay before the next attempt, or None when the error should propagate."""
+        if isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 429:
+            self._count('rate_limited')
+        if attempt >= retries - 1:
+            return None
+        if isinstance(error, httpx.HTTPStatusError):
+            status = error.response.status_code
+            if status == 429:
+                delay = _retry_delay(error.response, attempt)
+                if delay is None:
+                    logger.error("Brave monthly quota exhausted, not retrying")
+                    return None
+                self.limiter.pause(delay)
+                logger.warning(f"Brave rate limit hit, waiting {delay:.1f}s before retry")
+                return delay
+            if status < 500:
+                return None
+        elif not isinstance(error, httpx.TransportError):
+            return None
+        delay = 2 ** attempt + random.random()
+        logger.warning(f"Brave search failed ({str(error)}), retrying in {delay:.1f}s")
+        return delay
+
+    def _fetch(self, query: str, count: int, retries: int) -> List[SearchResult]:
+        for attempt in range(retries):
+            self.limiter.acquire()
+            self._count('requests')
+            try:
+                response = self.client.get(self.base_url, **_request(query, count))
+                response.raise_for_status()
+                return parse_results(response.json(), query)
+            except Exception as e:
+                delay = self._retryable(e, attempt, retries)
+                if delay is None:
+                    raise
+                self._count('retries')
+                self._count('retry_wait_total', delay)
+                # 429 delays are already enforced by the limiter pause
+                if not (isinstance(e, httpx.HTTPStatusError) and e.response.status_code == 429):
+                    time.sleep(delay)
+        return []
+
+    def search(self, query: str, count: int = None, retries: int = 3) -> List[SearchResult]:
+        """Raises the last httpx error once retries are exhausted or on a non-retryable status."""
+        key = self.cache.key(query, count or self.count)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._count('cache_hits')
+            return cached
+
+        with self._lock:
+            pending = self._inflight.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._inflight[key] = Future()
+        if not owner:
+            self._count('coalesced')
+            return [replace(r) for r in pending.result()]
+
+        try:
+            results = self._fetch(query, key[1], retries)
+            self.cache.put(key, results)
+            pending.set_result(results)
+            logger.info(f"Brave returned {len(results)} results for: {query}")
+            return [replace(r) for r in results]
+        except BaseException as e:
+            # Interrupts too: a waiter on an unresolved future would block forever
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    async def _afetch(self, client: httpx.AsyncClient, query: str, count: int, retries: int) -> List[SearchResult]:
+        for attempt in range(retries):
+            await self.limiter.aacquire()
+            self._count('requests')
+            try:
+                response = await client.get(self.base_url, **_request(query, count))
+                response.raise_for_status()
+                return parse_results(response.json(), query)
+            except Exception as e:
+                delay = self._retryable(e, attempt, retries)
+                if delay is None:
+                    raise
+                self._count('retries')
+                self._count('retry_wait_total', delay)
+                if not (isinstance(e, httpx.HTTPStatusError) and e.response.status_code == 429):
+                    await asyncio.sleep(delay)
+        return []
+
+    async def asearch(self, client: httpx.AsyncClient, query: str, count: int = None,
+                      retries: int = 3) -> List[SearchResult]:
+        """Async counterpart of search on the caller's client, sharing its cache and limiter."""
+        key = self.cache.key(query, count or self.count)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._count('cache_hits')
+            return cached
+
+        pending = self._ainflight.get(key)
+        if pending is not None:
+            self._count('coalesced')
+            return [replace(r) for r in await asyncio.shield(pending)]
+        pending = self._ainflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            results = await self._afetch(client, query, key[1], retries)
+            self.cache.put(key, results)
+            pending.set_result(results)
+            return [replace(r) for r in results]
+        except Exception as e:
+            pending.set_exception(e)
+            # Mark retrieved so an exception nobody else awaited is not reported as lost
+            pending.exception()
+            raise
+        finally:
+            # The owner was cancelled: fail the coalesced waiters instead of leaving them blocked
+            if not pending.done():
+                pending.set_exception(RuntimeError(f"Brave search was cancelled: {query}"))
+                pending.exception()
+            self._ainflight.pop(key, None)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats['limiter'] = dict(self.limiter.stats)
+        return stats
+
+    def close(self):
+        self.client.close()
@@ -1,9 +1,12 @@
 from config.log import logger
 from PIL import Image
+from dataclasses import dataclass
+import base64
 import io
 import math
 import time
 from tools.size_limit import ensure_size_within_limits
+from tools.page_ready import wait_for_page_ready, wait_for_next_frame
 
 def capture_full_page_screenshot(driver, url: str) -> bytes:
     """Capture a full page screenshot by scrolling and stitching."""
@@ -31,7 +34,9 @@ def capture_full_page_screenshot(driver, url: str) -> bytes:
             while offset < total_height:
                 # Scroll to position
                 driver.execute_script(f"window.scrollTo(0, {offset});")
-                time.sleep(0.5)  # Wait for scroll and content to load
+                # Wait for lazy-loaded content in the new section, then for it to paint
+                wait_for_page_ready(driver, timeout=1.5, quiet_window=0.2, signals=('network_idle', 'dom_quiet'))
+                wait_for_next_frame(driver)
                 
                 # Capture viewport
                 section_png = driver.get_screenshot_as_png()
@@ -81,7 +86,7 @@ def capture_full_page_screenshot(driver, url: str) -> bytes:
             # For shorter pages, still ensure we're within limits
             final_width, final_height = ensure_size_within_limits(total_width, total_height)
             driver.set_window_size(final_width, final_height)
-            time.sleep(0.5)
+            wait_for_next_frame(driver)
             return driver.get_screenshot_as_png()
             
     except Exception as e:
@@ -89,4 +94,68 @@ def capture_full_page_screenshot(driver, url: str) -> bytes:
         # Fallback to a safe capture
         safe_width, safe_height = ensure_size_within_limits(1920, 1080)
         driver.set_window_size(safe_width, safe_height)
-        return driver.get_screenshot_as_png()
\ No newline at end of file
+        return driver.get_screenshot_as_png()
+
+
+# Chrome cannot rasterise arbitrarily tall surfaces in one pass
+CDP_MAX_CLIP_HEIGHT = 8192
+MAX_CAPTURE_PIXELS = int(33177600 * 0.9)
+
+
+@dataclass
+class CaptureResult:
+    png: bytes
+    backend: str
+    elapsed: float
+
+
+def _capture_cdp(driver) -> bytes:
+    """Capture the whole document with Page.captureScreenshot, in as few clips as Chrome allows."""
+    metrics = driver.execute_cdp_cmd('Page.getLayoutMetrics', {})
+    content = metrics.get('cssContentSize') or metrics['contentSize']
+    width = min(int(math.ceil(content['width'])), 1920)
+    height = min(int(math.ceil(content['height'])), MAX_CAPTURE_PIXELS // max(width, 1))
+
+    clips = []
+    for y in range(0, height, CDP_MAX_CLIP_HEIGHT):
+        clip_height = min(CDP_MAX_CLIP_HEIGHT, height - y)
+        result = driver.execute_cdp_cmd('Page.captureScreenshot', {
+            'format': 'png',
+            'captureBeyondViewport': True,
+            'clip': {'x': 0, 'y': y, 'width': width, 'height': clip_height, 'scale': 1}
+        })
+        clips.append(base64.b64decode(result['data']))
+
+    if len(clips) == 1:
+        return clips[0]
+
+    sections = [Image.open(io.BytesIO(clip)) for clip in clips]
+    final_image = Image.new('RGB', (max(s.width for s in sections), sum(s.height for s in sections)))
+    y_offset = 0
+    for section in sections:
+        final_image.paste(section, (0, y_offset))
+        y_offset += section.height
+    output = io.BytesIO()
+    # Downstream re-encodes for the vision model, so favour speed over size here
+    final_image.save(output, format='PNG', compress_level=1)
+    return output.getvalue()
+
+
+def capture_page(driver, url: str) -> CaptureResult:
+    """Capture the full page via DevTools, falling back to scroll-and-stitch."""
+    start = time.time()
+    try:
+        png = _capture_cdp(driver)
+        result = CaptureResult(png=png, backend='cdp', elapsed=time.time() - start)
+    except Exception as e:
+        logger.warning(f"CDP capture failed for {url}, falling back to stitching: {str(e)}")
+        # The stitcher expects the window sized to the page
+        total_height = driver.execute_script("return Math.max(document.documentElement.scrollHeight, document.body.scrollHeight);")
+        total_width = driver.execute_script("return Math.max(document.documentElement.scrollWidth, document.body.scrollWidth);")
+        final_width, final_height = ensure_size_within_limits(total_width, total_height)
+        driver.set_window_size(final_width, final_height)
+        wait_for_next_frame(driver)
+        png = capture_full_page_screenshot(driver, url)
+        result = CaptureResult(png=png, backend='stitch', elapsed=time.time() - start)
+    logger.info(f"Captured {url} with {result.backend} backend in {result.elapsed:.2f}s")
+    return result
\ No newline at end of file
@@ -0,0 +1,98 @@
+from config.log import logger
+from config.settings import NORMALIZE_BUDGET_MS
+from typing import Dict
+
+NORMALIZE_STYLESHEET = """
+body { zoom: 200% !important; }
+a { text-decoration: underline !important; }
+[class*="cookie"], [class*="popup"], [class*="modal"],
+[id*="cookie"], [id*="popup"], [id*="modal"],
+.surf-hidden { display: none !important; }
+.surf-static { position: static !important; }
+.surf-min-font { font-size: 16px !important; }
+.surf-contrast { color: #000000 !important; }
+.surf-financial { font-size: 24px !important; font-weight: bold !important; color: #000000 !important; }
+td.surf-financial, th.surf-financial { padding: 10px !important; }
+"""
+
+# Reads first, writes last: styles are only queried for text-bearing elements and
+# a few shallow overlay candidates, so layout is computed once instead of per element.
+NORMALIZE_SCRIPT = """
+const budgetMs = arguments[0];
+const stylesheet = arguments[1];
+const start = performance.now();
+const stats = {textNodes: 0, elements: 0, financial: 0, minFont: 0, contrast: 0, overlays: 0, truncated: false};
+
+const style = document.createElement('style');
+style.id = 'surf-normalize';
+style.textContent = stylesheet;
+(document.head || document.documentElement).appendChild(style);
+
+const financial = /\\$|\\d+\\.\\d+|\\d+%|price|stock|market|share/i;
+const marks = new Map();
+function mark(el, cls) {
+    if (!marks.has(el)) marks.set(el, []);
+    marks.get(el).push(cls);
+}
+
+// Fixed/sticky overlays live near the top of the tree; check only shallow candidates
+const candidates = document.body ? document.body.querySelectorAll(':scope > *, :scope > * > *') : [];
+for (let i = 0; i < candidates.length && i < 300; i++) {
+    const position = getComputedStyle(candidates[i]).position;
+    if (position === 'fixed') { mark(candidates[i], 'surf-hidden'); stats.overlays++; }
+    else if (position === 'sticky') { mark(candidates[i], 'surf-static'); stats.overlays++; }
+}
+
+const seen = new Set();
+const walker = document.createTreeWalker(document.body || document.documentElement, NodeFilter.SHOW_TEXT, {
+    acceptNode: node => node.data.trim() ? NodeFilter.FILTER_ACCEPT : NodeFilter.FILTER_REJECT
+});
+let node;
+while ((node = walker.nextNode())) {
+    stats.textNodes++;
+    if ((stats.textNodes & 63) === 0 && performance.now() - start > budgetMs) {
+        stats.truncated = true;
+        break;
+    }
+    const el = node.parentElement;
+    if (!el || seen.has(el) || el.tagName === 'SCRIPT' || el.tagName === 'STYLE') continue;
+    seen.add(el);
+    stats.elements++;
+
+    // Only the element's own text counts, not everything beneath an ancestor
+    if (financial.test(node.data)) {
+        const cell = el.closest('td, th');
+        mark(cell || el, 'surf-financial');
+        stats.financial++;
+        continue;
+    }
+    const computed = getComputedStyle(el);
+    if (parseInt(computed.fontSize) < 16) { mark(el, 'surf-min-font'); stats.minFont++; }
+    const color = computed.color;
+    if (color === computed.backgroundColor || color === 'rgba(0, 0, 0, 0)' || color === 'rgb(255, 255, 255)') {
+        mark(el, 'surf-contrast');
+        stats.contrast++;
+    }
+}
+
+marks.forEach((classes, el) => el.classList.add(...classes));
+stats.elapsedMs = performance.now() - start;
+return stats;
+"""
+
+
+def normalize_dom(driver, budget_ms: float = NORMALIZE_BUDGET_MS) -> Dict:
+    """Make the page legible for the vision model within a hard time budget.
+
+    Returns the script's counters (text nodes visited, elements restyled,
+    elapsed time, whether the budget cut the pass short).
+    """
+    try:
+        stats = driver.execute_script(NORMALIZE_SCRIPT, budget_ms, NORMALIZE_STYLESHEET) or {}
+    except Exception as e:
+        logger.warning(f"DOM normalization failed: {str(e)}")
+        return {}
+    logger.info(f"Normalized DOM in {stats.get('elapsedMs', 0):.0f} ms: {stats.get('textNodes', 0)} text nodes, "
+                f"{stats.get('financial', 0)} financial, {stats.get('overlays', 0)} overlays"
+                f"{' (budget reached)' if stats.get('truncated') else ''}")
+    return stats
\ No newline at end of file
@@ -0,0 +1,315 @@
+from config.log import logger
+from config.settings import DRIVER_POOL_SIZE, DRIVER_MAX_PAGES, DRIVER_MAX_MEMORY_MB, DRIVER_LEASE_TIMEOUT
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from webdriver_manager.chrome import ChromeDriverManager
+from tools.page_ready import install_readiness_probes, drain_network_log
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Set
+import threading
+import atexit
+import time
+
+DEFAULT_WINDOW_SIZE = (1920, 1080)
+PAGE_LOAD_TIMEOUT = 60
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36'
+
+
+class LeaseError(RuntimeError):
+    """No session could be leased: the pool timed out, is shut down or Chrome failed to start."""
+
+
+class PooledDriver:
+    """A warm Chrome session plus the bookkeeping the pool needs to recycle it."""
+
+    def __init__(self, driver, session_id: int):
+        self.driver = driver
+        self.session_id = session_id
+        self.created_at = time.time()
+        self.pages_served = 0
+        self.broken = False
+
+    def mark_broken(self):
+        """Flag the session so it is discarded instead of returned to the pool."""
+        self.broken = True
+
+
+class DriverPool:
+    def __init__(self, size: int = DRIVER_POOL_SIZE, max_pages: int = DRIVER_MAX_PAGES,
+                 max_memory_mb: int = DRIVER_MAX_MEMORY_MB, lease_timeout: float = DRIVER_LEASE_TIMEOUT):
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self.lease_timeout = lease_timeout
+        self._idle: List[PooledDriver] = []
+        self._in_use = 0
+        self._created = 0
+        self._next_id = 0
+        self._closed = False
+        self._driver_path = None
+        self._cond = threading.Condition()
+        self._metrics = {
+            'leases': 0,
+            'wait_time_total': 0.0,
+            'wait_time_max': 0.0,
+            'lease_time_total': 0.0,
+            'waits': 0,
+            'timeouts': 0,
+            'sessions_created': 0,
+            'sessions_recycled': 0,
+            'health_check_failures': 0,
+        }
+
+    def _build_options(self) -> Options:
+        chrome_options = Options()
+        chrome_options.add_argument('--headless')
+        chrome_options.add_argument(f'--window-size={DEFAULT_WINDOW_SIZE[0]},{DEFAULT_WINDOW_SIZE[1]}')
+        chrome_options.add_argument('--disable-gpu')  # To avoid potential issues with headless mode
+        chrome_options.add_argument('--disable-blink-features=AutomationControlled')  # Hide automation
+        chrome_options.add_argument('--disable-notifications')
+        chrome_options.add_argument('--enable-precise-memory-info')
+        chrome_options.add_argument(f'user-agent={USER_AGENT}')
+        # Return from get() at DOMContentLoaded; tools.page_ready decides when the page is usable
+        chrome_options.page_load_strategy = 'eager'
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        return chrome_options
+
+    def _create_session(self) -> PooledDriver:
+        # Resolving the chromedriver binary hits the network, so do it once per process
+        if self._driver_path is None:
+            self._driver_path = ChromeDriverManager().install()
+        driver = webdriver.Chrome(
+            service=Service(self._driver_path),
+            options=self._build_options()
+        )
+        driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+        try:
+            # Applies to every document the session loads, not just the current one
+            driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
+                'source': "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+            })
+        except Exception as e:
+            logger.warning(f"Could not install webdriver mask: {str(e)}")
+        install_readiness_probes(driver)
+        with self._cond:
+            self._next_id += 1
+            session_id = self._next_id
+            self._metrics['sessions_created'] += 1
+        logger.info(f"Started pooled Chrome session #{session_id}")
+        return PooledDriver(driver, session_id)
+
+    def _quit(self, pooled: PooledDriver):
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            logger.warning(f"Error quitting Chrome session #{pooled.session_id}: {str(e)}")
+
+    def _is_healthy(self, pooled: PooledDriver) -> bool:
+        try:
+            return pooled.driver.execute_script("return 1;") == 1
+        except Exception:
+            return False
+
+    def _memory_mb(self, pooled: PooledDriver) -> float:
+        try:
+            used = pooled.driver.execute_script(
+                "return (performance.memory && performance.memory.usedJSHeapSize) || 0;")
+            return float(used) / (1024 * 1024)
+        except Exception:
+            return 0.0
+
+    def _needs_recycle(self, pooled: PooledDriver) -> Optional[str]:
+        if pooled.broken:
+            return "marked broken"
+        if pooled.pages_served >= self.max_pages:
+            return f"served {pooled.pages_served} pages"
+        memory_mb = self._memory_mb(pooled)
+        if memory_mb > self.max_memory_mb:
+            return f"JS heap at {memory_mb:.0f} MB"
+        return None
+
+    def _frame_origins(self, driver) -> Set[str]:
+        """Web origins of every frame in the current tab, iframes included."""
+        try:
+            stack = [driver.execute_cdp_cmd('Page.getFrameTree', {})['frameTree']]
+        except Exception:
+            stack = []
+        origins = set()
+        while stack:
+            node = stack.pop()
+            origin = node.get('frame', {}).get('securityOrigin', '')
+            if origin.startswith('http'):
+                origins.add(origin)
+            stack.extend(node.get('childFrames', []))
+        return origins
+
+    def _reset(self, pooled: PooledDriver):
+        """Return a session to a blank state: one tab, no cookies, no storage."""
+        driver = pooled.driver
+        handles = driver.window_handles
+        origins = set()
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            origins |= self._frame_origins(driver)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        origins |= self._frame_origins(driver)
+        driver.delete_all_cookies()
+        try:
+            driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        except Exception:
+            pass
+        # Storage is per origin: clear it for every page and iframe the lease left loaded
+        for origin in origins:
+            try:
+                driver.execute_cdp_cmd('Storage.clearDataForOrigin', {
+                    'origin': origin,
+                    'storageTypes': 'local_storage,session_storage,indexeddb,cache_storage,service_workers'
+                })
+            except Exception as e:
+                logger.warning(f"Could not clear storage for {origin}: {str(e)}")
+        driver.get('about:blank')
+        driver.set_window_size(*DEFAULT_WINDOW_SIZE)
+        driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+        drain_network_log(driver)
+
+    def warm(self):
+        """Start sessions until the pool holds its configured size."""
+        while True:
+            with self._cond:
+                if self._closed or self._created >= self.size:
+                    return
+                self._created += 1
+            try:
+                pooled = self._create_session()
+            except Exception:
+                with self._cond:
+                    self._created -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._idle.append(pooled)
+                self._cond.notify()
+
+    def _acquire(self, timeout: float) -> PooledDriver:
+        start = time.time()
+        deadline = start + timeout
+        waited = False
+        while True:
+            create = False
+            with self._cond:
+                while not self._idle and self._created >= self.size and not self._closed:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        self._metrics['timeouts'] += 1
+                        raise TimeoutError(f"No Chrome session available after {timeout:.0f}s")
+                    waited = True
+                    self._cond.wait(remaining)
+                if self._closed:
+                    raise RuntimeError("Driver pool is shut down")
+                if self._idle:
+                    pooled = self._idle.pop()
+                else:
+                    self._created += 1
+                    create = True
+            if create:
+                try:
+                    pooled = self._create_session()
+                except Exception:
+                    with self._cond:
+                        self._created -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._is_healthy(pooled):
+                logger.warning(f"Chrome session #{pooled.session_id} failed health check, replacing it")
+                self._discard(pooled, count_failure=True)
+                continue
+            wait_time = time.time() - start
+            with self._cond:
+                self._in_use += 1
+                self._metrics['leases'] += 1
+                self._metrics['wait_time_total'] += wait_time
+                self._metrics['wait_time_max'] = max(self._metrics['wait_time_max'], wait_time)
+                if waited:
+                    self._metrics['waits'] += 1
+            return pooled
+
+    def _discard(self, pooled: PooledDriver, count_failure: bool = False):
+        self._quit(pooled)
+        with self._cond:
+            self._created -= 1
+            if count_failure:
+                self._metrics['health_check_failures'] += 1
+            else:
+                self._metrics['sessions_recycled'] += 1
+            self._cond.notify()
+
+    def _release(self, pooled: PooledDriver, lease_time: float):
+        with self._cond:
+            self._in_use -= 1
+            self._metrics['lease_time_total'] += lease_time
+        pooled.pages_served += 1
+
+        reason = self._needs_recycle(pooled)
+        if reason is None:
+            try:
+                self._reset(pooled)
+            except Exception as e:
+                reason = f"reset failed ({str(e)})"
+
+        if reason is not None or self._closed:
+            if reason:
+                logger.info(f"Recycling Chrome session #{pooled.session_id}: {reason}")
+            self._discard(pooled)
+            return
+
+        with self._cond:
+            self._idle.append(pooled)
+            self._cond.notify()
+
+    @contextmanager
+    def lease(self, timeout: float = None):
+        """Lease a warm Chrome session for the duration of the block.
+
+        Yields the PooledDriver; call mark_broken() on it if the session should
+        not be reused. Raises LeaseError when no session can be had.
+        """
+        try:
+            pooled = self._acquire(self.lease_timeout if timeout is None else timeout)
+        except Exception as e:
+            raise LeaseError(str(e)) from e
+        leased_at = time.time()
+        try:
+            yield pooled
+        finally:
+            self._release(pooled, time.time() - leased_at)
+
+    def stats(self) -> Dict:
+        with self._cond:
+            leases = self._metrics['leases']
+            return {
+                **self._metrics,
+                'size': self.size,
+                'live_sessions': self._created,
+                'idle': len(self._idle),
+                'in_use': self._in_use,
+                'avg_wait_time': self._metrics['wait_time_total'] / leases if leases else 0.0,
+                'avg_lease_time': self._metrics['lease_time_total'] / leases if leases else 0.0,
+            }
+
+    def shutdown(self):
+        """Quit every idle session and refuse new leases."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+            self._cond.notify_all()
+        for pooled in idle:
+            self._quit(pooled)
+        if idle:
+            logger.info(f"Driver pool shut down ({len(idle)} sessions closed), stats: {self.stats()}")
+
+
+driver_pool = DriverPool()
+atexit.register(driver_pool.shutdown)
\ No newline at end of file
@@ -1,17 +1,22 @@
-import re
 from urllib.parse import urlparse
 from typing import List
 from config.log import logger
 from tools.host_tracker import host_tracker 
+from tools.brave_search import SearchResult
+from tools.url_canon import url_canonicalizer
 
-def extract_urls_from_search_results(search_text: str) -> List[str]:
-    urls = re.findall(r'(https?://[^\s\'"]+)', search_text)
-    valid_urls = []
-    for url in urls:
-        url = re.sub(r'[.,)\]]+$', '', url)
-        if url.startswith(('http://', 'https://')):
-            if not host_tracker.is_problematic_host(url):
-                valid_urls.append(url)
-            else:
-                logger.info(f"Filtered out problematic host: {urlparse(url).netloc}")
-    return list(set(valid_urls))
\ No newline at end of file
+def urls_from_results(results: List[SearchResult]) -> List[str]:
+    """URLs of structured search results in their given order, minus duplicates and unhealthy hosts."""
+    urls = []
+    seen = set()
+    for result in results:
+        key = url_canonicalizer.key(result.url)
+        if key in seen or not result.url.startswith(('http://', 'https://')):
+            continue
+        seen.add(key)
+        decision = host_tracker.admit(result.url, probe=False)
+        if decision.admit:
+            urls.append(result.url)
+        else:
+            logger.info(f"Filtered out unhealthy host {urlparse(result.url).netloc}: {decision.reason}")
+    return urls
\ No newline at end of file
@@ -1,166 +1,185 @@
 from config.log import logger
-from tools.host_tracker import host_tracker 
-from PIL import Image
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+from tools.host_tracker import host_tracker, looks_like_bot_wall, BOT_WALL
 from urllib.parse import urlparse
-import time
-import io
-import base64
-from tools.size_limit import ensure_size_within_limits
-from tools.capture_ss import capture_full_page_screenshot
+from tools.capture_ss import capture_page
+from tools.roi_capture import capture_regions
+from tools.dom_normalize import normalize_dom
+from tools.vision_payload import build_vision_payload
+from tools.driver_pool import driver_pool, LeaseError
+from tools.page_ready import wait_for_page_ready, wait_for_next_frame, drain_network_log
 from configure.vision import configure_vision_model
 from configure.config_llm import configure_llm
+from configure.registry import model_registry
 from tools.vision_query import generate_vision_query
+from tools.text_extract import fetch_html, extract_text_from_html
+from tools.page_cache import page_cache, cache_key
+from tools.url_canon import url_canonicalizer, find_canonical_link
+from config.settings import EXTRACTION_MODE, SCREENSHOT_MODE
+from typing import Optional, Tuple
+import threading
+import time
+
+# Per-path counters; vision_time_avg is what a text-path page would have cost
+extraction_stats = {
+    'text_http': 0,
+    'text_dom': 0,
+    'vision': 0,
+    'vision_time_avg': None,
+    'time_saved': 0.0,
+    'vision_bytes_sent': 0,
+    'vision_encode_time': 0.0,
+    'capture_backends': {},
+    'normalize_ms': 0.0
+}
+# Fetches run on worker threads; every update to extraction_stats goes through this lock
+_stats_lock = threading.Lock()
 
 
-def fetch_webpage_content(url: str, provider: str, original_query: str) -> str:
-    """Fetch webpage content by capturing a screenshot via Selenium and processing it with a vision model."""
-    if host_tracker .is_problematic_host(url):
-        logger.info(f"Skipping known problematic host: {urlparse(url).netloc}")
-        return f"Skipped: Known problematic host"
+def record_stat(name: str, amount: float = 1):
+    with _stats_lock:
+        extraction_stats[name] += amount
 
+
+def _try_text(html: str, url: str, original_query: str, source: str, started: float):
+    """Return the page text if it is good enough to skip the vision model, else None."""
+    if not html:
+        return None
     try:
-        # Set up Selenium (headless Chrome)
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--window-size=1920,1080')
-        chrome_options.add_argument('--disable-gpu')  # To avoid potential issues with headless mode
-        chrome_options.add_argument('--disable-blink-features=AutomationControlled')  # Hide automation
-        chrome_options.add_argument('--disable-notifications')
-        
-        # Add headers to appear more like a real browser
-        chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36')
-        
-        driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()),
-            options=chrome_options
-        )
-        driver.set_page_load_timeout(60)
-        
-        # Set cookies and localStorage to bypass some anti-bot measures
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        
-        # Attempt to load the page
-        driver.get(url)
-        time.sleep(2)  # Give time for dynamic content to load
-        
-        # Check for and handle CAPTCHA/cookie popups
-        try:
-            driver.execute_script("""
-                // Remove common overlay elements
-                document.querySelectorAll('[class*="cookie"], [class*="popup"], [class*="modal"], [id*="cookie"], [id*="popup"], [id*="modal"]')
-                    .forEach(el => el.remove());
-                // Remove fixed position elements that might overlay content
-                document.querySelectorAll('*').forEach(el => {
-                    const style = window.getComputedStyle(el);
-                    if (style.position === 'fixed' || style.position === 'sticky') {
-                        el.remove();
-                    }
-                });
-            """)
-        except Exception as e:
-            logger.warning(f"Error handling overlays: {str(e)}")
-        
-        # Set text size and ensure readability with special handling for financial data
-        driver.execute_script("""
-            // Set base zoom
-            document.body.style.zoom = '200%';  // Increased from 125%
-            
-            // Function to check if text might be financial data
-            function isFinancialData(text) {
-                return /\\$|\\d+\\.\\d+|\\d+%|price|stock|market|share/i.test(text);
-            }
-            
-            // Ensure text is readable with special handling for financial data
-            document.querySelectorAll('*').forEach(function(el) {
-                let style = window.getComputedStyle(el);
-                let text = el.textContent || '';
-                
-                // Special handling for financial data
-                if (isFinancialData(text)) {
-                    el.style.fontSize = '24px';  // Larger size for financial data
-                    el.style.fontWeight = 'bold';
-                    el.style.color = '#000000';  // Ensure high contrast
-                } else if (parseInt(style.fontSize) < 16) {  // Increased minimum font size
-                    el.style.fontSize = '16px';
-                }
-                
-                // Improve contrast
-                if (style.color && style.backgroundColor) {
-                    let textColor = style.color;
-                    let bgColor = style.backgroundColor;
-                    if (textColor === bgColor || textColor === 'rgba(0, 0, 0, 0)' || 
-                        textColor === 'rgb(255, 255, 255)' || textColor === '#ffffff') {
-                        el.style.color = '#000000';
-                    }
-                }
-                
-                // Improve visibility of links
-                if (el.tagName.toLowerCase() === 'a') {
-                    el.style.textDecoration = 'underline';
-                }
-            });
-            
-            // Additional handling for table cells (common in financial data)
-            document.querySelectorAll('td, th').forEach(function(el) {
-                let text = el.textContent || '';
-                if (isFinancialData(text)) {
-                    el.style.padding = '10px';
-                    el.style.fontSize = '24px';
-                    el.style.fontWeight = 'bold';
-                }
-            });
-        """)
-
-        # Additional wait for text adjustments
-        time.sleep(2)  # Increased wait time
-        
-        # Get dimensions and ensure they're within limits
-        total_height = driver.execute_script("return Math.max(document.documentElement.scrollHeight, document.body.scrollHeight);")
-        total_width = driver.execute_script("return Math.max(document.documentElement.scrollWidth, document.body.scrollWidth);")
-        
-        final_width, final_height = ensure_size_within_limits(total_width, total_height)
-        logger.info(f"Adjusted dimensions to {final_width}x{final_height} to stay within pixel limit")
-        
-        # Set final window size
-        driver.set_window_size(final_width, final_height)
-        time.sleep(1)
-        
-        # Capture the screenshot using our improved method
-        screenshot_png = capture_full_page_screenshot(driver, url)
-        driver.quit()
+        text, quality = extract_text_from_html(html, original_query)
+    except Exception as e:
+        logger.warning(f"Text extraction failed for {url}: {str(e)}")
+        return None
+    elapsed = time.time() - started
+    if not quality.sufficient:
+        logger.info(f"Extraction decision for {url}: {source} text insufficient "
+                    f"(score={quality.score:.2f}, {'; '.join(quality.reasons)})")
+        return None
 
-        # Process the image
-        img = Image.open(io.BytesIO(screenshot_png))
-        
-        # Convert to RGB and enhance readability
-        if img.mode in ('RGBA', 'P'):
-            img = img.convert('RGB')
-        
-        # Enhance image quality with specified values
-        from PIL import ImageEnhance
-        enhancer = ImageEnhance.Sharpness(img)
-        img = enhancer.enhance(1.25)  # Modified sharpness value
-        enhancer = ImageEnhance.Contrast(img)
-        img = enhancer.enhance(1.25)  # Modified contrast value
-        
-        # Save with high quality
-        output = io.BytesIO()
-        img.save(output, format='JPEG', quality=100, optimize=True)  # Maximum quality
-        screenshot_data = output.getvalue()
-        
-        # Convert to base64
-        base64_image = base64.b64encode(screenshot_data).decode('utf-8')
-        
+    with _stats_lock:
+        extraction_stats[f'text_{source}'] += 1
+        saved = (extraction_stats['vision_time_avg'] or 0.0) - elapsed
+        if saved > 0:
+            extraction_stats['time_saved'] += saved
+    logger.info(f"Extraction decision for {url}: {source} text (score={quality.score:.2f}, "
+                f"{quality.words} words) in {elapsed:.2f}s, saved ~{max(saved, 0.0):.1f}s vs vision")
+    return text
+
+
+def fetch_webpage_content(url: str, provider: str, original_query: str, query_type: str = 'general', plan=None) -> str:
+    """Fetch webpage content, preferring readable page text and falling back to a screenshot read by a vision model.
+
+    plan is the caller's ResearchPlan; when given, its vision query is reused
+    instead of generating one per URL. A fresh page cache entry is returned
+    even for a host whose circuit is open.
+    """
+    if plan is not None:
+        query_type = plan.query_type
+    # Keyed before fetching: the fetch may record a canonical alias for the URL
+    key = cache_key(url, query_type, original_query)
+    # Looked up before the circuit breaker so a fresh entry is served even while the host is refused
+    cached = page_cache.get(key)
+    if cached is not None:
+        logger.info(f"Page cache hit for {url}")
+        return cached
+
+    decision = host_tracker.admit(url)
+    if not decision.admit:
+        logger.info(f"Skipping unhealthy host {urlparse(url).netloc}: {decision.reason}")
+        return f"Skipped: Host unavailable ({decision.reason})"
+    logger.info(f"Fetching {url} (host {decision.state}, expected cost {decision.expected_cost:.1f}s)")
+
+    if plan is not None:
+        vision_query = plan.vision_query
+    else:
+        vision_query = generate_vision_query(configure_llm(provider), original_query)
+
+    started = time.time()
+    content, path = _fetch_page(url, provider, original_query, vision_query)
+    if path:
+        host_tracker.record_success(url, time.time() - started)
+        page_cache.put(key, url, vision_query, content, query_type, {'path': path, 'fetch_time': time.time() - started})
+    return content
+
+
+def _fetch_page(url: str, provider: str, original_query: str, vision_query: str) -> Tuple[str, Optional[str]]:
+    """Extract page content; returns (content, extraction path) with path None on failure."""
+    started = time.time()
+    use_text = EXTRACTION_MODE != 'vision'
+    if use_text:
+        html = fetch_html(url)
+        canonical = find_canonical_link(html, url)
+        if canonical:
+            url_canonicalizer.record_canonical(url, canonical)
+        text = _try_text(html, url, original_query, 'http', started)
+        if text:
+            return text, 'http'
+
+    try:
+        # Lease a warm headless Chrome session instead of starting a new browser
+        with driver_pool.lease() as pooled:
+            driver = pooled.driver
+            try:
+                # Attempt to load the page
+                drain_network_log(driver)
+                driver.get(url)
+                ready = wait_for_page_ready(driver)
+                logger.info(f"Page ready after {ready.elapsed:.2f}s (ended by {ready.signal}): {url}")
+                if looks_like_bot_wall(driver.title):
+                    host_tracker.record_failure(url, BOT_WALL, time.time() - started)
+                    logger.info(f"Bot wall at {url}: {driver.title}")
+                    return f"Error processing {url}: blocked by bot wall", None
+                canonical = driver.execute_script(
+                    "const link = document.querySelector('link[rel=\"canonical\"]'); return link ? link.href : null;")
+                if canonical:
+                    url_canonicalizer.record_canonical(url, canonical)
+
+                # The rendered DOM often has the text a plain GET missed (client-side rendering)
+                if use_text:
+                    text = _try_text(driver.page_source, url, original_query, 'dom', started)
+                    if text:
+                        return text, 'dom'
+        
+                # Hide overlays and make text legible: one stylesheet plus a bounded text-node pass
+                normalized = normalize_dom(driver)
+                record_stat('normalize_ms', normalized.get('elapsedMs', 0.0))
+
+                # Wait for the restyled DOM to settle and repaint
+                wait_for_page_ready(driver, timeout=2, signals=('dom_quiet', 'fonts'))
+                wait_for_next_frame(driver)
+        
+                # Capture only the regions matching the topic when possible, else the full page
+                capture = capture_regions(driver, url, original_query) if SCREENSHOT_MODE == 'roi' else None
+                if capture is None:
+                    capture = capture_page(driver, url)
+                screenshot_png = capture.png
+                with _stats_lock:
+                    backends = extraction_stats['capture_backends']
+                    backends[capture.backend] = backends.get(capture.backend, 0) + 1
+            except Exception:
+                # A session that failed mid-page may be wedged: let the pool replace it
+                pooled.mark_broken()
+                raise
+    except LeaseError as e:
+        # A busy pool or a Chrome that will not start is a local problem, not the host's
+        host_tracker.release_probe(url)
+        logger.error(f"No browser session for {url}: {str(e)}")
+        return f"Error processing {url}: {str(e)}", None
+    except Exception as e:
+        # Navigation and render failures are the host's; vision model errors below are not
+        kind = host_tracker.record_failure(url, e, time.time() - started)
+        logger.error(f"Error loading {url} ({kind}): {str(e)}")
+        return f"Error processing {url}: {str(e)}", None
+    loaded = time.time() - started
+
+    try:
         vision_llm = configure_vision_model(provider)
-        text_llm = configure_llm(provider)
-        
-        vision_query = generate_vision_query(text_llm, original_query)
         logger.info(f"Using vision query: {vision_query}")
 
+        # Downsample and encode for what the vision model actually processes
+        payload = build_vision_payload(screenshot_png, vision_llm)
+        record_stat('vision_bytes_sent', payload.bytes_sent)
+        record_stat('vision_encode_time', payload.encode_time)
+
         messages = [
             {
                 "role": "user",
@@ -169,7 +188,7 @@ def fetch_webpage_content(url: str, provider: str, original_query: str) -> str:
                     {
                         "type": "image_url",
                         "image_url": {
-                            "url": f"data:image/jpeg;base64,{base64_image}",
+                            "url": payload.data_url,
                             "detail": "high"
                         }
                     }
@@ -178,7 +197,8 @@ def fetch_webpage_content(url: str, provider: str, original_query: str) -> str:
         ]
         
         logger.info(f"Processing screenshot from {url} with vision model ({provider})")
-        vision_response = vision_llm.invoke(messages)
+        with model_registry.track(vision_llm):
+            vision_response = vision_llm.invoke(messages)
         
         extracted_text = vision_response.content.strip()
         
@@ -188,10 +208,18 @@ def fetch_webpage_content(url: str, provider: str, original_query: str) -> str:
         print(extracted_text)
         print("="*80 + "\n")
         
+        vision_time = time.time() - started
+        with _stats_lock:
+            average = extraction_stats['vision_time_avg']
+            extraction_stats['vision'] += 1
+            extraction_stats['vision_time_avg'] = vision_time if average is None else average * 0.8 + vision_time * 0.2
+        logger.info(f"Extraction decision for {url}: vision ({vision_time:.1f}s)")
+        
         logger.info(f"Successfully processed content from {url}")
-        return extracted_text
+        return extracted_text, 'vision'
         
     except Exception as e:
-        host_tracker .add_failed_host(url)
-        logger.error(f"Error processing {url}: {str(e)}")
-        return f"Error processing {url}: {str(e)}"
\ No newline at end of file
+        # The host served the page; only the model failed
+        host_tracker.record_success(url, loaded)
+        logger.error(f"Error processing {url} with vision model: {str(e)}")
+        return f"Error processing {url}: {str(e)}", None
\ No newline at end of file
@@ -1,42 +1,306 @@
 from config.log import logger
-from urllib.parse import urlparse
+from config.settings import (HOST_FAILURE_THRESHOLD, HOST_BACKOFF_BASE, HOST_BACKOFF_MAX,
+                             HOST_HEALTH_PATH, HOST_SNAPSHOT_INTERVAL)
+from collections import deque
+from dataclasses import dataclass
+from tools.url_canon import canonical_host
+from typing import Dict, Optional, Union
+import threading
+import tempfile
+import atexit
+import json
+import time
 import os
+import re
+
+TIMEOUT = 'timeout'
+BOT_WALL = 'bot_wall'
+HTTP_ERROR = 'http_error'
+RENDER_ERROR = 'render_error'
+
+# Backoff multiplier per failure kind: a bot wall will not go away in a minute, a timeout might
+BACKOFF_FACTORS = {TIMEOUT: 1, RENDER_ERROR: 2, HTTP_ERROR: 5, BOT_WALL: 30}
+# Kinds that open the circuit on the first occurrence
+IMMEDIATE_TRIP = {BOT_WALL}
+
+BOT_WALL_TITLES = re.compile(r'(?i)just a moment|attention required|access denied|are you a robot|captcha|'
+                             r'verify you are human|pardon our interruption|request unsuccessful')
+HTTP_STATUS = re.compile(r'\b(4\d\d|5\d\d)\b')
+
+DEFAULT_COST = 10.0
+PROBE_TIMEOUT = 120.0
+LATENCY_SAMPLES = 50
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+def classify_failure(error: Union[BaseException, str]) -> str:
+    """Map an exception (or error text) to timeout, http_error or render_error.
+
+    Bot walls are never inferred from error text, which can quote anything;
+    callers that see one in the page title or response record BOT_WALL directly.
+    """
+    name = type(error).__name__ if isinstance(error, BaseException) else ''
+    message = str(error)
+    if 'Timeout' in name or re.search(r'(?i)timed? ?out', message):
+        return TIMEOUT
+    if 'HTTPError' in name or 'HTTPStatusError' in name or HTTP_STATUS.search(message):
+        return HTTP_ERROR
+    return RENDER_ERROR
+
+
+def looks_like_bot_wall(title: str) -> bool:
+    return bool(title and BOT_WALL_TITLES.search(title))
+
+
+@dataclass
+class HostDecision:
+    admit: bool
+    state: str
+    expected_cost: float
+    reason: str = ''
+
+
+class HostHealth:
+    __slots__ = ('host', 'state', 'consecutive_failures', 'failures', 'successes', 'failure_kinds',
+                 'last_failure_kind', 'open_until', 'probe_started', 'latencies')
+
+    def __init__(self, host: str):
+        self.host = host
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.failures = 0
+        self.successes = 0
+        self.failure_kinds: Dict[str, int] = {}
+        self.last_failure_kind: Optional[str] = None
+        self.open_until = 0.0
+        self.probe_started = 0.0
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def expected_cost(self) -> float:
+        """Expected seconds per successful fetch: median latency over smoothed success probability."""
+        latency = self.percentile(0.5) or DEFAULT_COST
+        success_probability = (self.successes + 1) / (self.successes + self.failures + 2)
+        return latency / success_probability
+
+    def to_dict(self) -> Dict:
+        return {
+            'state': self.state,
+            'consecutive_failures': self.consecutive_failures,
+            'failures': self.failures,
+            'successes': self.successes,
+            'failure_kinds': self.failure_kinds,
+            'last_failure_kind': self.last_failure_kind,
+            'open_until': self.open_until,
+            'latencies': list(self.latencies)
+        }
+
+    @classmethod
+    def from_dict(cls, host: str, data: Dict) -> 'HostHealth':
+        health = cls(host)
+        health.state = data.get('state', CLOSED)
+        if health.state == HALF_OPEN:
+            health.state = OPEN
+        health.consecutive_failures = data.get('consecutive_failures', 0)
+        health.failures = data.get('failures', 0)
+        health.successes = data.get('successes', 0)
+        health.failure_kinds = data.get('failure_kinds', {})
+        health.last_failure_kind = data.get('last_failure_kind')
+        health.open_until = data.get('open_until', 0.0)
+        health.latencies.extend(data.get('latencies', []))
+        return health
+
 
 class HostTracker:
-    def __init__(self, filename="HOSTS.txt"):
-        self.filename = filename
-        self.failed_hosts = set()
-        self.load_failed_hosts()
-    
-    def load_failed_hosts(self):
-        """Load failed hosts from file."""
+    """Per-host circuit breaker.
+
+    A host's circuit opens after HOST_FAILURE_THRESHOLD consecutive
+    failures (a bot wall opens it at once) for a backoff window that
+    doubles with each further failure. Once the window has passed, one
+    probe request is let through (half-open): success closes the circuit,
+    failure reopens it with a longer window. State lives in memory and is
+    snapshotted to HOST_HEALTH_PATH.
+    """
+
+    def __init__(self, path: str = HOST_HEALTH_PATH, legacy_filename: str = "HOSTS.txt"):
+        self.path = path
+        self.legacy_filename = legacy_filename
+        self.hosts: Dict[str, HostHealth] = {}
+        self._lock = threading.Lock()
+        self._snapshot_lock = threading.Lock()
+        self._last_snapshot = time.time()
+        self.load()
+        atexit.register(self.snapshot)
+
+    def load(self):
         try:
-            if os.path.exists(self.filename):
-                with open(self.filename, 'r') as f:
-                    self.failed_hosts = set(line.strip() for line in f if line.strip())
-                logger.info(f"Loaded {len(self.failed_hosts)} problematic hosts from {self.filename}")
+            if self.path and os.path.exists(self.path):
+                with open(self.path, 'r') as f:
+                    data = json.load(f)
+                self.hosts = {host: HostHealth.from_dict(host, info) for host, info in data.items()}
+                logger.info(f"Loaded health for {len(self.hosts)} hosts from {self.path}")
+            elif os.path.exists(self.legacy_filename):
+                # The old blacklist was one failure per host: keep that as a strike, not a ban
+                with open(self.legacy_filename, 'r') as f:
+                    for line in f:
+                        host = canonical_host(f"http://{line.strip()}") if line.strip() else ''
+                        if host:
+                            health = self.hosts[host] = HostHealth(host)
+                            health.consecutive_failures = health.failures = 1
+                            health.failure_kinds = {RENDER_ERROR: 1}
+                            health.last_failure_kind = RENDER_ERROR
+                logger.info(f"Imported {len(self.hosts)} hosts from {self.legacy_filename} with one recorded failure each")
         except Exception as e:
-            logger.error(f"Error loading failed hosts: {str(e)}")
-            self.failed_hosts = set()
-    
-    def add_failed_host(self, url: str):
-        """Add a failed host to the tracking list."""
+            logger.error(f"Error loading host health: {str(e)}")
+            self.hosts = {}
+
+    def snapshot(self):
+        if not self.path:
+            return
+        tmp_path = None
         try:
-            host = urlparse(url).netloc
-            if host and host not in self.failed_hosts:
-                self.failed_hosts.add(host)
-                with open(self.filename, 'a') as f:
-                    f.write(f"{host}\n")
-                logger.info(f"Added {host} to problematic hosts list")
+            with self._lock:
+                data = {host: health.to_dict() for host, health in self.hosts.items()}
+                self._last_snapshot = time.time()
+            directory = os.path.dirname(self.path) or '.'
+            os.makedirs(directory, exist_ok=True)
+            # Writers are serialized and each gets its own temp file next to the target
+            with self._snapshot_lock:
+                fd, tmp_path = tempfile.mkstemp(prefix='.host_health_', suffix='.tmp', dir=directory)
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.path)
+                tmp_path = None
         except Exception as e:
-            logger.error(f"Error adding failed host: {str(e)}")
-    
+            logger.error(f"Error saving host health: {str(e)}")
+        finally:
+            if tmp_path:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+    def _maybe_snapshot(self):
+        with self._lock:
+            due = time.time() - self._last_snapshot >= HOST_SNAPSHOT_INTERVAL
+            if due:
+                # Claimed under the lock so concurrent callers do not all snapshot at once
+                self._last_snapshot = time.time()
+        if due:
+            self.snapshot()
+
+    @staticmethod
+    def _host(url: str) -> str:
+        return canonical_host(url)
+
+    def admit(self, url: str, probe: bool = True) -> HostDecision:
+        """Decide whether to fetch from the URL's host and what it is expected to cost.
+
+        With probe=False the call only looks: it never claims the single
+        half-open probe slot, so filtering candidates does not use it up.
+        """
+        host = self._host(url)
+        now = time.time()
+        with self._lock:
+            health = self.hosts.get(host)
+            if health is None:
+                return HostDecision(True, CLOSED, DEFAULT_COST)
+            cost = health.expected_cost()
+            if health.state == CLOSED:
+                return HostDecision(True, CLOSED, cost)
+            if now < health.open_until:
+                return HostDecision(False, OPEN, cost,
+                                    f"{health.last_failure_kind}, retry in {health.open_until - now:.0f}s")
+            if health.state == HALF_OPEN and now - health.probe_started < PROBE_TIMEOUT:
+                return HostDecision(False, HALF_OPEN, cost, "probe in flight")
+            if probe:
+                health.state = HALF_OPEN
+                health.probe_started = now
+            return HostDecision(True, HALF_OPEN, cost, "probe")
+
+    def record_success(self, url: str, latency: float):
+        host = self._host(url)
+        with self._lock:
+            health = self.hosts.setdefault(host, HostHealth(host))
+            if health.state != CLOSED:
+                logger.info(f"Host {host} recovered, closing circuit")
+            health.state = CLOSED
+            health.consecutive_failures = 0
+            health.successes += 1
+            health.latencies.append(latency)
+        self._maybe_snapshot()
+
+    def record_failure(self, url: str, error: Union[BaseException, str], latency: float = None) -> str:
+        """Count a failure against the host; returns its classification."""
+        host = self._host(url)
+        kind = error if error in BACKOFF_FACTORS else classify_failure(error)
+        with self._lock:
+            health = self.hosts.setdefault(host, HostHealth(host))
+            health.consecutive_failures += 1
+            health.failures += 1
+            health.failure_kinds[kind] = health.failure_kinds.get(kind, 0) + 1
+            health.last_failure_kind = kind
+            if latency is not None and kind == TIMEOUT:
+                health.latencies.append(latency)
+
+            if (health.state == HALF_OPEN or kind in IMMEDIATE_TRIP or
+                    health.consecutive_failures >= HOST_FAILURE_THRESHOLD):
+                # Failures past the one that first opened the circuit; a bot wall opens it on the first
+                threshold = 1 if kind in IMMEDIATE_TRIP else HOST_FAILURE_THRESHOLD
+                trips = max(0, health.consecutive_failures - threshold)
+                window = min(HOST_BACKOFF_BASE * BACKOFF_FACTORS[kind] * (2 ** trips), HOST_BACKOFF_MAX)
+                health.state = OPEN
+                health.open_until = time.time() + window
+                logger.info(f"Opened circuit for {host} after {health.consecutive_failures} failures "
+                            f"({kind}), backing off {window:.0f}s")
+            else:
+                logger.info(f"Recorded {kind} failure for {host} ({health.consecutive_failures} in a row)")
+        self._maybe_snapshot()
+        return kind
+
+    def release_probe(self, url: str):
+        """Give back a half-open probe slot when the fetch never reached the host."""
+        with self._lock:
+            health = self.hosts.get(self._host(url))
+            if health is not None and health.state == HALF_OPEN:
+                health.state = OPEN
+                health.probe_started = 0.0
+
+    def latency_percentiles(self, url: str) -> Dict[str, Optional[float]]:
+        with self._lock:
+            health = self.hosts.get(self._host(url))
+            if health is None:
+                return {'p50': None, 'p90': None, 'p99': None}
+            return {'p50': health.percentile(0.5), 'p90': health.percentile(0.9), 'p99': health.percentile(0.99)}
+
+    def stats(self) -> Dict:
+        with self._lock:
+            states = {CLOSED: 0, OPEN: 0, HALF_OPEN: 0}
+            kinds = {}
+            for health in self.hosts.values():
+                states[health.state] += 1
+                for kind, count in health.failure_kinds.items():
+                    kinds[kind] = kinds.get(kind, 0) + count
+            return {'hosts': len(self.hosts), 'states': states, 'failure_kinds': kinds}
+
+    def add_failed_host(self, url: str):
+        """Compatibility wrapper: record an unclassified failure."""
+        self.record_failure(url, RENDER_ERROR)
+
     def is_problematic_host(self, url: str) -> bool:
-        """Check if a URL's host is in the problematic list."""
+        """Compatibility wrapper: True while the host's circuit is refusing requests."""
         try:
-            host = urlparse(url).netloc
-            return host in self.failed_hosts
+            return not self.admit(url, probe=False).admit
         except Exception:
             return False
-        
-host_tracker = HostTracker()
\ No newline at end of file
+
+
+host_tracker = HostTracker()
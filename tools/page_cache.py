@@ -0,0 +1,145 @@
+from config.log import logger
+from config.settings import PAGE_CACHE_PATH, PAGE_CACHE_MAX_MB, PAGE_CACHE_TTLS
+from tools.url_canon import url_canonicalizer
+from typing import Dict, Optional
+import hashlib
+import sqlite3
+import threading
+import json
+import time
+import os
+
+
+def cache_key(url: str, query_type: str, topic: str) -> str:
+    """Key on the canonical URL, query type and normalized topic.
+
+    Both paths depend on the topic: page text is only accepted when it
+    covers the topic's keywords, and a vision reading answers the topic's
+    question. The topic stands in for the vision query, which is
+    LLM-generated and not stable across runs.
+    """
+    canonical = url_canonicalizer.key(url)
+    normalized = ' '.join(topic.lower().split())
+    return hashlib.sha256(f"{canonical}\n{query_type}\n{normalized}".encode('utf-8')).hexdigest()
+
+
+class PageCache:
+    """SQLite-backed store of extracted page content with per-query-type TTLs and LRU eviction."""
+
+    def __init__(self, path: str = PAGE_CACHE_PATH, max_mb: float = PAGE_CACHE_MAX_MB, ttls: Dict[str, float] = None):
+        self.path = path
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.ttls = ttls or PAGE_CACHE_TTLS
+        self._lock = threading.Lock()
+        self._conn = None
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'expired': 0,
+            'stores': 0,
+            'evictions': 0,
+            'hit_time_total': 0.0,
+            'fetch_time_saved': 0.0
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    key TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    vision_query TEXT NOT NULL,
+                    query_type TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    timings TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )""")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS pages_last_access ON pages (last_access)")
+        return self._conn
+
+    def ttl_for(self, query_type: str) -> float:
+        return self.ttls.get(query_type, self.ttls.get('general', 3600))
+
+    def get(self, *keys: str) -> Optional[str]:
+        """Return cached content for the first of keys with a fresh entry, or None on a miss or expiry."""
+        start = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                for key in keys:
+                    row = conn.execute("SELECT content, expires_at, timings FROM pages WHERE key = ?", (key,)).fetchone()
+                    if row is None:
+                        continue
+                    content, expires_at, timings = row
+                    if expires_at < start:
+                        conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+                        conn.commit()
+                        self._stats['expired'] += 1
+                        continue
+                    conn.execute("UPDATE pages SET last_access = ? WHERE key = ?", (start, key))
+                    conn.commit()
+                    self._stats['hits'] += 1
+                    self._stats['hit_time_total'] += time.time() - start
+                    self._stats['fetch_time_saved'] += json.loads(timings).get('fetch_time', 0.0)
+                    return content
+                self._stats['misses'] += 1
+                return None
+        except sqlite3.Error as e:
+            logger.error(f"Page cache read failed: {str(e)}")
+            return None
+
+    def put(self, key: str, url: str, vision_query: str, content: str, query_type: str, timings: Dict):
+        """Store extracted content under key; evicts least recently used entries beyond the size cap.
+
+        key should be the one the lookup used: fetching can teach the
+        canonicalizer a new alias for the URL, which would change cache_key.
+        """
+        now = time.time()
+        size = len(content.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, url, vision_query, query_type, content,
+                     json.dumps(timings), size, now, now + self.ttl_for(query_type), now)
+                )
+                self._stats['stores'] += 1
+                self._evict(conn)
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Page cache write failed: {str(e)}")
+
+    def _evict(self, conn: sqlite3.Connection):
+        conn.execute("DELETE FROM pages WHERE expires_at < ?", (time.time(),))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute("SELECT key, size FROM pages ORDER BY last_access ASC").fetchall():
+            conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+            self._stats['evictions'] += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                **self._stats,
+                'hit_rate': self._stats['hits'] / lookups if lookups else 0.0,
+                'avg_hit_time': self._stats['hit_time_total'] / self._stats['hits'] if self._stats['hits'] else 0.0
+            }
+
+
+page_cache = PageCache()
\ No newline at end of file
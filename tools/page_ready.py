@@ -0,0 +1,150 @@
+from config.log import logger
+from config.settings import PAGE_READY_TIMEOUT, PAGE_QUIET_WINDOW
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Set
+import json
+import time
+
+# Installed on every new document; records when nodes were last added or removed.
+# Attribute and text edits are ignored: tickers and clocks make them forever.
+MUTATION_PROBE = """
+(function() {
+    window.__surfLastMutation = performance.now();
+    var observer = new MutationObserver(function() {
+        window.__surfLastMutation = performance.now();
+    });
+    observer.observe(document, {subtree: true, childList: true});
+})();
+"""
+
+READY_STATE_SCRIPT = """
+if (window.__surfLastMutation === undefined) {
+    %s
+}
+return {
+    readyState: document.readyState,
+    sinceMutation: performance.now() - window.__surfLastMutation,
+    fontsReady: !document.fonts || document.fonts.status === 'loaded'
+};
+""" % MUTATION_PROBE
+
+NETWORK_START = 'Network.requestWillBeSent'
+NETWORK_END = ('Network.loadingFinished', 'Network.loadingFailed')
+SIGNALS = ('ready_state', 'network_idle', 'dom_quiet', 'fonts')
+
+
+@dataclass
+class ReadyResult:
+    signal: str
+    elapsed: float
+    signals: Dict[str, Optional[float]] = field(default_factory=dict)
+
+    @property
+    def timed_out(self) -> bool:
+        return self.signal == 'timeout'
+
+
+def install_readiness_probes(driver):
+    """Register the DOM mutation probe so it runs before any page script."""
+    try:
+        driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': MUTATION_PROBE})
+    except Exception as e:
+        logger.warning(f"Could not install readiness probes: {str(e)}")
+
+
+def drain_network_log(driver) -> list:
+    """Read and discard buffered DevTools events (call before navigating)."""
+    try:
+        return driver.get_log('performance')
+    except Exception:
+        return []
+
+
+def _update_inflight(entries: list, inflight: Set[str]) -> bool:
+    """Apply Network.* events to the in-flight request set; True if any were seen."""
+    seen = False
+    for entry in entries:
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, ValueError, TypeError):
+            continue
+        method = message.get('method')
+        params = message.get('params', {})
+        if method == NETWORK_START:
+            if params.get('request', {}).get('url', '').startswith('data:'):
+                continue
+            inflight.add(params.get('requestId'))
+            seen = True
+        elif method in NETWORK_END:
+            inflight.discard(params.get('requestId'))
+            seen = True
+    return seen
+
+
+def wait_for_page_ready(driver, timeout: float = PAGE_READY_TIMEOUT, quiet_window: float = PAGE_QUIET_WINDOW,
+                        max_inflight: int = 2, poll_interval: float = 0.1,
+                        signals: tuple = SIGNALS) -> ReadyResult:
+    """Wait until the page is ready according to the requested signals.
+
+    Network activity comes from the DevTools performance log; DOM quiescence
+    from the mutation probe. The result names the signal that was satisfied
+    last (the one that ended the wait), or 'timeout'.
+    """
+    start = time.time()
+    inflight: Set[str] = set()
+    last_network_activity = start
+    network_log_available = True
+    satisfied_at: Dict[str, Optional[float]] = {name: None for name in signals}
+
+    while True:
+        now = time.time()
+        try:
+            state = driver.execute_script(READY_STATE_SCRIPT) or {}
+        except Exception as e:
+            logger.warning(f"Readiness probe failed: {str(e)}")
+            state = {}
+
+        if 'network_idle' in signals and network_log_available:
+            try:
+                entries = driver.get_log('performance')
+            except Exception:
+                # Performance logging not enabled for this session
+                network_log_available = False
+                entries = []
+            if _update_inflight(entries, inflight):
+                last_network_activity = now
+
+        current = {
+            'ready_state': state.get('readyState') == 'complete',
+            'network_idle': (len(inflight) <= max_inflight and now - last_network_activity >= quiet_window)
+                            if network_log_available else state.get('readyState') == 'complete',
+            'dom_quiet': (state.get('sinceMutation') or 0) >= quiet_window * 1000,
+            'fonts': bool(state.get('fontsReady', True)),
+        }
+        for name in signals:
+            if current[name]:
+                if satisfied_at[name] is None:
+                    satisfied_at[name] = now - start
+            else:
+                satisfied_at[name] = None
+
+        if all(satisfied_at[name] is not None for name in signals):
+            last_signal = max(signals, key=lambda name: satisfied_at[name])
+            return ReadyResult(signal=last_signal, elapsed=time.time() - start, signals=satisfied_at)
+
+        if now - start >= timeout:
+            return ReadyResult(signal='timeout', elapsed=time.time() - start, signals=satisfied_at)
+
+        time.sleep(poll_interval)
+
+
+def wait_for_next_frame(driver, timeout: float = 2.0):
+    """Block until the browser has laid out and painted the current DOM."""
+    try:
+        driver.set_script_timeout(timeout)
+        driver.execute_async_script("""
+            var done = arguments[arguments.length - 1];
+            requestAnimationFrame(function() { requestAnimationFrame(function() { done(true); }); });
+        """)
+    except Exception as e:
+        logger.warning(f"Frame wait failed: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,134 @@
+from config.log import logger
+from config.settings import ROI_MAX_REGIONS, ROI_PADDING
+from tools.capture_ss import CaptureResult
+from tools.text_extract import topic_keywords
+from PIL import Image
+from typing import Dict, List, Optional
+import base64
+import io
+import time
+
+# Scores elements against the topic keywords and returns their boxes in page coordinates.
+# Text is read with textContent (no layout) and rects only for elements that matched.
+FIND_REGIONS_SCRIPT = """
+const keywords = arguments[0];
+const maxRegions = arguments[1];
+const selector = 'table, h1, h2, h3, h4, p, li, dl, [class*="price"], [class*="quote"], [data-test*="price"]';
+const viewportHeight = window.innerHeight;
+const scored = [];
+
+for (const el of document.querySelectorAll(selector)) {
+    const text = (el.textContent || '').slice(0, 2000).toLowerCase();
+    let hits = 0;
+    for (const keyword of keywords) {
+        if (text.includes(keyword)) hits++;
+    }
+    if (!hits) continue;
+
+    let rect = el.getBoundingClientRect();
+    if (rect.width < 20 || rect.height < 10) continue;
+    let score = hits / keywords.length;
+    if (el.tagName === 'TABLE') score += 0.5;
+    if (/\\d/.test(text)) score += 0.1;
+
+    let left = rect.left, top = rect.top, right = rect.right, bottom = rect.bottom;
+    if (/^H[1-4]$/.test(el.tagName)) {
+        // A matching heading stands for the block beneath it
+        score += 0.2;
+        const next = el.nextElementSibling;
+        if (next) {
+            const nextRect = next.getBoundingClientRect();
+            left = Math.min(left, nextRect.left);
+            right = Math.max(right, nextRect.right);
+            bottom = Math.max(bottom, Math.min(nextRect.bottom, rect.bottom + viewportHeight));
+        }
+    }
+    if (bottom - top > viewportHeight * 2) score *= 0.5;
+
+    scored.push({
+        x: left + window.scrollX,
+        y: top + window.scrollY,
+        width: right - left,
+        height: Math.min(bottom - top, viewportHeight * 2),
+        score: score
+    });
+}
+
+scored.sort((a, b) => b.score - a.score);
+const regions = [];
+for (const box of scored) {
+    const overlapping = regions.find(r =>
+        box.x < r.x + r.width && r.x < box.x + box.width &&
+        box.y < r.y + r.height && r.y < box.y + box.height);
+    if (overlapping) {
+        const right = Math.max(overlapping.x + overlapping.width, box.x + box.width);
+        const bottom = Math.max(overlapping.y + overlapping.height, box.y + box.height);
+        overlapping.x = Math.min(overlapping.x, box.x);
+        overlapping.y = Math.min(overlapping.y, box.y);
+        overlapping.width = right - overlapping.x;
+        overlapping.height = bottom - overlapping.y;
+        continue;
+    }
+    regions.push(box);
+    if (regions.length >= maxRegions) break;
+}
+return regions;
+"""
+
+REGION_GAP = 12
+
+
+def find_regions(driver, topic: str, max_regions: int = ROI_MAX_REGIONS) -> List[Dict]:
+    keywords = topic_keywords(topic)
+    if not keywords:
+        return []
+    return driver.execute_script(FIND_REGIONS_SCRIPT, keywords, max_regions) or []
+
+
+def capture_regions(driver, url: str, topic: str) -> Optional[CaptureResult]:
+    """Screenshot only the elements that best match the topic, packed top to bottom.
+
+    Returns None when nothing on the page matches, so the caller can fall
+    back to a full-page capture.
+    """
+    start = time.time()
+    try:
+        regions = find_regions(driver, topic)
+        if not regions:
+            return None
+
+        # Keep regions in reading order in the packed image
+        regions.sort(key=lambda r: (r['y'], r['x']))
+        sections = []
+        for region in regions:
+            x = max(0, region['x'] - ROI_PADDING)
+            y = max(0, region['y'] - ROI_PADDING)
+            result = driver.execute_cdp_cmd('Page.captureScreenshot', {
+                'format': 'png',
+                'captureBeyondViewport': True,
+                'clip': {
+                    'x': x,
+                    'y': y,
+                    'width': min(region['width'] + 2 * ROI_PADDING, 1920),
+                    'height': region['height'] + 2 * ROI_PADDING,
+                    'scale': 1
+                }
+            })
+            sections.append(Image.open(io.BytesIO(base64.b64decode(result['data']))))
+
+        width = max(section.width for section in sections)
+        height = sum(section.height for section in sections) + REGION_GAP * (len(sections) - 1)
+        packed = Image.new('RGB', (width, height), 'white')
+        y_offset = 0
+        for section in sections:
+            packed.paste(section, (0, y_offset))
+            y_offset += section.height + REGION_GAP
+
+        output = io.BytesIO()
+        packed.save(output, format='PNG', compress_level=1)
+        elapsed = time.time() - start
+        logger.info(f"Captured {len(sections)} regions of interest from {url} ({width}x{height}) in {elapsed:.2f}s")
+        return CaptureResult(png=output.getvalue(), backend='roi', elapsed=elapsed)
+    except Exception as e:
+        logger.warning(f"Region capture failed for {url}: {str(e)}")
+        return None
\ No newline at end of file
@@ -0,0 +1,146 @@
+from config.log import logger
+from config.settings import TEXT_MIN_SCORE, TEXT_MIN_WORDS, TEXT_MAX_CHARS
+from bs4 import BeautifulSoup
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+import requests
+import re
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36'
+
+# Elements that never hold the main content
+BOILERPLATE_TAGS = ['script', 'style', 'noscript', 'template', 'svg', 'nav', 'footer', 'header', 'aside', 'form', 'iframe', 'button']
+BOILERPLATE_HINTS = re.compile(r'(?i)cookie|consent|banner|advert|promo|newsletter|subscribe|share|social|related|comment|sidebar|menu|breadcrumb')
+STOPWORDS = {'what', 'which', 'when', 'where', 'does', 'with', 'that', 'this', 'from', 'about', 'latest', 'current', 'information', 'data', 'much', 'many', 'there', 'their', 'have'}
+
+session = requests.Session()
+session.headers.update({'User-Agent': USER_AGENT, 'Accept-Language': 'en-US,en;q=0.9'})
+
+
+@dataclass
+class TextQuality:
+    score: float
+    words: int
+    link_density: float
+    images: int
+    canvases: int
+    keyword_coverage: float
+    reasons: List[str] = field(default_factory=list)
+
+    @property
+    def sufficient(self) -> bool:
+        return not self.reasons
+
+
+def fetch_html(url: str, timeout: float = 10) -> Optional[str]:
+    """Plain HTTP GET; returns None for non-HTML or failed responses."""
+    try:
+        response = session.get(url, timeout=timeout)
+        if response.status_code != 200 or 'html' not in response.headers.get('Content-Type', ''):
+            return None
+        return response.text
+    except requests.RequestException as e:
+        logger.info(f"Plain fetch failed for {url}: {str(e)}")
+        return None
+
+
+def _main_container(soup: BeautifulSoup):
+    for selector in ('article', 'main', '[role="main"]', '[itemprop="articleBody"]'):
+        candidate = soup.select_one(selector)
+        if candidate and len(candidate.get_text(' ', strip=True)) > 200:
+            return candidate
+
+    # Otherwise pick the block whose direct paragraphs carry the most text
+    best, best_len = soup.body or soup, 0
+    for block in soup.find_all(['div', 'section', 'td']):
+        text_len = sum(len(p.get_text(strip=True)) for p in block.find_all('p', recursive=False))
+        if text_len > best_len:
+            best, best_len = block, text_len
+    return best
+
+
+def extract_main_text(soup: BeautifulSoup) -> str:
+    """Strip boilerplate and return the readable text of the main content block."""
+    for tag in soup(BOILERPLATE_TAGS):
+        tag.decompose()
+    for attr in ('class', 'id'):
+        for tag in soup.find_all(attrs={attr: BOILERPLATE_HINTS}):
+            if tag.name not in ('html', 'body', 'main', 'article'):
+                tag.decompose()
+
+    container = _main_container(soup)
+    lines = []
+    for element in container.find_all(['h1', 'h2', 'h3', 'h4', 'p', 'li', 'tr', 'dt', 'dd', 'blockquote', 'pre']):
+        if element.find(['p', 'li', 'tr']):
+            continue
+        if element.name == 'tr':
+            text = ' | '.join(cell.get_text(' ', strip=True) for cell in element.find_all(['td', 'th']))
+        else:
+            text = element.get_text(' ', strip=True)
+        if text:
+            lines.append(text)
+    if not lines:
+        lines = [container.get_text('\n', strip=True)]
+    return re.sub(r'\n{3,}', '\n\n', '\n'.join(lines)).strip()
+
+
+def topic_keywords(topic: str) -> List[str]:
+    words = re.findall(r'[a-z0-9]+', topic.lower())
+    return [w for w in words if len(w) > 3 and w not in STOPWORDS]
+
+
+def page_stats(soup: BeautifulSoup) -> Dict[str, float]:
+    """Visual-weight stats of the untouched document (run before boilerplate removal)."""
+    link_text = sum(len(a.get_text(strip=True)) for a in soup.find_all('a'))
+    all_text = max(1, len(soup.get_text(strip=True)))
+    return {
+        'link_density': min(1.0, link_text / all_text),
+        'images': len(soup.find_all('img')),
+        'canvases': len(soup.find_all('canvas')),
+    }
+
+
+def score_text(text: str, stats: Dict[str, float], topic: str) -> TextQuality:
+    """Score how well extracted text can stand in for the vision pipeline."""
+    words = len(text.split())
+    link_density = stats['link_density']
+    images = stats['images']
+    canvases = stats['canvases']
+    keywords = topic_keywords(topic)
+    lowered = text.lower()
+    keyword_coverage = (sum(1 for k in keywords if k in lowered) / len(keywords)) if keywords else 1.0
+
+    score = (min(words / (TEXT_MIN_WORDS * 4), 1.0) * 0.5 +
+             (1.0 - link_density) * 0.2 +
+             keyword_coverage * 0.3)
+
+    reasons = []
+    if words < TEXT_MIN_WORDS:
+        reasons.append(f"thin text ({words} words)")
+    if canvases and words < TEXT_MIN_WORDS * 2:
+        reasons.append(f"canvas-rendered content ({canvases} canvas)")
+    if images >= 10 and words < images * 30:
+        reasons.append(f"image-heavy ({images} images)")
+    if keywords and keyword_coverage == 0:
+        reasons.append("no topic keywords in text")
+    if score < TEXT_MIN_SCORE:
+        reasons.append(f"score {score:.2f} below {TEXT_MIN_SCORE}")
+
+    return TextQuality(
+        score=score,
+        words=words,
+        link_density=link_density,
+        images=images,
+        canvases=canvases,
+        keyword_coverage=keyword_coverage,
+        reasons=reasons
+    )
+
+
+def extract_text_from_html(html: str, topic: str):
+    """Return (main text capped at TEXT_MAX_CHARS, TextQuality) for an HTML document."""
+    soup = BeautifulSoup(html, 'html.parser')
+    stats = page_stats(soup)
+    text = extract_main_text(soup)
+    quality = score_text(text, stats, topic)
+    return text[:TEXT_MAX_CHARS], quality
\ No newline at end of file
@@ -0,0 +1,102 @@
+from config.log import logger
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode, urljoin
+from typing import Dict, Optional
+import threading
+import re
+
+# Only click IDs and analytics tags: a generic name like ref or amp can select content on some sites
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    'guccounter', 'guce_referrer', 'guce_referrer_sig', '_ga', '_gl'
+}
+TRACKING_PREFIXES = ('utm_', 'mc_', 'pk_', 'hsa_', 'vero_', 'oly_')
+# Host prefixes that serve the same content as the bare domain
+MIRROR_PREFIXES = ('www.', 'm.', 'mobile.', 'amp.')
+AMP_PATH = re.compile(r'(/amp/?$|/amp(?=/)|\.amp(?=$|\.html?$))', re.IGNORECASE)
+CANONICAL_LINK = re.compile(r'<link\b[^>]*\brel=["\']?canonical\b[^>]*>', re.IGNORECASE)
+HREF = re.compile(r'\bhref=["\']?([^"\'\s>]+)', re.IGNORECASE)
+
+
+def canonical_host(url: str) -> str:
+    """Lower-cased host without default ports or www./m./amp. mirror prefixes."""
+    parsed = urlparse(url.strip())
+    host = (parsed.hostname or '').rstrip('.')
+    if parsed.port and parsed.port not in (80, 443):
+        host = f"{host}:{parsed.port}"
+    for prefix in MIRROR_PREFIXES:
+        if host.startswith(prefix) and host.count('.') > 1:
+            host = host[len(prefix):]
+            break
+    return host
+
+
+def canonicalize_url(url: str) -> str:
+    """Key under which URLs for the same document compare equal.
+
+    Not meant to be fetched: the scheme is forced to https, mirror hosts
+    and AMP paths are collapsed, and the fragment, tracking parameters and
+    trailing slash are dropped.
+    """
+    parsed = urlparse(url.strip())
+    path = AMP_PATH.sub('', parsed.path)
+    path = re.sub(r'/{2,}', '/', path)
+    if path.endswith('/'):
+        path = path.rstrip('/')
+    params = [
+        (key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ]
+    return urlunparse(('https', canonical_host(url), path or '/', '', urlencode(sorted(params)), ''))
+
+
+def find_canonical_link(html: str, base_url: str) -> Optional[str]:
+    """The page's <link rel=canonical> target, resolved against its URL."""
+    if not html:
+        return None
+    head = html[:200000]
+    match = CANONICAL_LINK.search(head)
+    if not match:
+        return None
+    href = HREF.search(match.group(0))
+    if not href:
+        return None
+    target = urljoin(base_url, href.group(1))
+    return target if target.startswith(('http://', 'https://')) else None
+
+
+class UrlCanonicalizer:
+    """Canonical keys for URLs, refined by rel=canonical links from pages already seen."""
+
+    def __init__(self):
+        self._aliases: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._stats = {'duplicates_avoided': 0, 'canonical_links': 0}
+
+    def key(self, url: str) -> str:
+        canonical = canonicalize_url(url)
+        with self._lock:
+            return self._aliases.get(canonical, canonical)
+
+    def record_canonical(self, url: str, canonical_url: str):
+        """Remember that url declared canonical_url, so both resolve to the same key."""
+        source = canonicalize_url(url)
+        target = canonicalize_url(canonical_url)
+        if source == target:
+            return
+        with self._lock:
+            target = self._aliases.get(target, target)
+            self._aliases[source] = target
+            self._stats['canonical_links'] += 1
+        logger.info(f"Canonical link: {url} -> {canonical_url}")
+
+    def record_duplicate(self, url: str):
+        with self._lock:
+            self._stats['duplicates_avoided'] += 1
+        logger.info(f"Skipping duplicate of an already visited page: {url}")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self._stats, aliases=len(self._aliases))
+
+
+url_canonicalizer = UrlCanonicalizer()
@@ -0,0 +1,122 @@
+from config.log import logger
+from config.settings import VISION_PAYLOAD_MAX_BYTES
+from PIL import Image, ImageEnhance
+from dataclasses import dataclass
+from typing import Tuple
+import base64
+import io
+import time
+
+
+@dataclass
+class VisionProfile:
+    """How a vision model sees images: a grid of square tiles with a cap on their count."""
+    tile_size: int
+    max_tiles: int
+    max_bytes: int = VISION_PAYLOAD_MAX_BYTES
+
+
+@dataclass
+class VisionPayload:
+    data_url: str
+    mime_type: str
+    width: int
+    height: int
+    bytes_sent: int
+    source_bytes: int
+    encode_time: float
+    quality: int
+
+
+# Llama 3.2 Vision resizes every image onto at most 4 tiles of 560x560,
+# both the 11B Ollama build and the 90B model served by Groq
+VISION_PROFILES = {
+    'llama3.2-vision': VisionProfile(tile_size=560, max_tiles=4),
+    'llama-3.2-11b-vision': VisionProfile(tile_size=560, max_tiles=4),
+    'llama-3.2-90b-vision': VisionProfile(tile_size=560, max_tiles=4),
+}
+DEFAULT_PROFILE = VisionProfile(tile_size=512, max_tiles=16)
+JPEG_QUALITIES = (90, 80, 70, 60, 50, 40)
+
+
+def profile_for(vision_llm) -> VisionProfile:
+    model = str(getattr(vision_llm, 'model', None) or getattr(vision_llm, 'model_name', '') or '')
+    for name, profile in VISION_PROFILES.items():
+        if model.startswith(name):
+            return profile
+    return DEFAULT_PROFILE
+
+
+def target_size(width: int, height: int, profile: VisionProfile) -> Tuple[int, int]:
+    """Largest size, keeping aspect ratio, that fits the best tile grid for this image."""
+    best = (width, height)
+    best_scale = 0.0
+    for cols in range(1, profile.max_tiles + 1):
+        for rows in range(1, profile.max_tiles // cols + 1):
+            scale = min(cols * profile.tile_size / width, rows * profile.tile_size / height, 1.0)
+            if scale > best_scale:
+                best_scale = scale
+                best = (max(1, int(width * scale)), max(1, int(height * scale)))
+    return best
+
+
+def _resize(img: Image.Image, size: Tuple[int, int]) -> Image.Image:
+    if size == img.size:
+        return img
+    # Integer box reduction first: far cheaper than LANCZOS on a 30 MP screenshot
+    factor = min(img.width // size[0], img.height // size[1])
+    if factor >= 2:
+        img = img.reduce(factor)
+    return img.resize(size, Image.Resampling.LANCZOS)
+
+
+def _encode(img: Image.Image, max_bytes: int) -> Tuple[bytes, str, int]:
+    """Pick format and quality: lossless PNG when it fits, else the best JPEG under budget."""
+    # Flat screenshots with few colours (mostly text) are often smaller as PNG
+    if img.getcolors(maxcolors=4096) is not None:
+        output = io.BytesIO()
+        img.save(output, format='PNG', optimize=True)
+        if output.tell() <= max_bytes:
+            return output.getvalue(), 'image/png', 100
+
+    data = b''
+    quality = JPEG_QUALITIES[-1]
+    for quality in JPEG_QUALITIES:
+        output = io.BytesIO()
+        img.save(output, format='JPEG', quality=quality, optimize=True)
+        data = output.getvalue()
+        if len(data) <= max_bytes:
+            break
+    return data, 'image/jpeg', quality
+
+
+def build_vision_payload(screenshot_png: bytes, vision_llm) -> VisionPayload:
+    """Downsample a screenshot to the model's native input size and encode it within the byte budget."""
+    start = time.time()
+    profile = profile_for(vision_llm)
+    img = Image.open(io.BytesIO(screenshot_png))
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+
+    img = _resize(img, target_size(img.width, img.height, profile))
+
+    # Enhance after resizing: same effect on what the model sees, a fraction of the pixels
+    img = ImageEnhance.Sharpness(img).enhance(1.25)
+    img = ImageEnhance.Contrast(img).enhance(1.25)
+
+    data, mime_type, quality = _encode(img, profile.max_bytes)
+    encode_time = time.time() - start
+    payload = VisionPayload(
+        data_url=f"data:{mime_type};base64,{base64.b64encode(data).decode('utf-8')}",
+        mime_type=mime_type,
+        width=img.width,
+        height=img.height,
+        bytes_sent=len(data),
+        source_bytes=len(screenshot_png),
+        encode_time=encode_time,
+        quality=quality
+    )
+    logger.info(f"Vision payload: {payload.width}x{payload.height} {mime_type} q={quality}, "
+                f"{payload.bytes_sent / 1024:.0f} KB (from {payload.source_bytes / 1024:.0f} KB PNG) "
+                f"in {encode_time:.2f}s")
+    return payload
\ No newline at end of file